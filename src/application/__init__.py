@@ -8,5 +8,6 @@ Este pacote contém classes e funções para a lógica de aplicação da comunic
 """
 
 from src.application.modbus_handler import ModbusDataHandler
+from src.application.modbus_poller import ModbusPoller
 
-__all__ = ['ModbusDataHandler']
+__all__ = ['ModbusDataHandler', 'ModbusPoller']
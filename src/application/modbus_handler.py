@@ -6,10 +6,14 @@ Módulo para manipulação de dados Modbus na camada de aplicação.
 Adaptado para trabalhar com o servidor mock que utiliza posições específicas no vetor.
 """
 
+import asyncio
 import logging
+import operator
+import threading
+import time
 from src.communication import ModbusClientManager
-from src.utils import ModbusDataConverter
-from src.config import REGISTER_MAP
+from src.utils import ModbusDataConverter, DECODERS, ENCODERS, plan_reads, MAX_READ_COUNT, MAX_WRITE_COUNT
+from src.config import REGISTER_MAP, SNAPSHOT_TTL
 
 logger = logging.getLogger(__name__)
 
@@ -27,14 +31,23 @@ class ModbusDataHandler:
     - Posição 3: posicao_gaveta (uint16)
     """
     
-    def __init__(self, client_manager):
+    def __init__(self, client_manager, cache_ttl=SNAPSHOT_TTL):
         """
         Inicializa o manipulador de dados Modbus.
         
         Args:
             client_manager (ModbusClientManager): Instância do gerenciador de cliente Modbus
+            cache_ttl (float): Tempo em segundos durante o qual o resultado de
+                read_all_tags é reaproveitado (0 desabilita o cache)
         """
         self.client_manager = client_manager
+        self.cache_ttl = cache_ttl
+        # Última leitura completa das tags: (instante time.monotonic, valores)
+        self._snapshot = None
+        # Incrementada a cada invalidação: uma leitura iniciada antes de uma escrita
+        # encontra outra geração ao terminar e não é armazenada
+        self._snapshot_generation = 0
+        self._snapshot_lock = threading.Lock()
         self.converter = ModbusDataConverter()
         
         # Mapeamento direto de tags para posições no vetor
@@ -44,6 +57,64 @@ class ModbusDataHandler:
             "gaveta": 2,
             "posicao_gaveta": 3
         }
+        
+        # Configuração de cada tag resolvida uma única vez a partir do REGISTER_MAP:
+        # (posição, quantidade, tipo de registro, tipo de dado, escala)
+        self._tags = {}
+        for tag_name, tag_config in REGISTER_MAP.items():
+            register_type = tag_config.get("register_type", "holding")  # Tipo padrão é holding register
+            position = tag_config["address"]
+            if register_type == "holding":
+                # Usar a posição específica no vetor para holding registers
+                position = self.tag_positions.get(tag_name, position)
+            self._tags[tag_name] = (
+                position,
+                tag_config["count"],
+                register_type,
+                tag_config.get("type", "uint16"),
+                tag_config.get("scale", 1.0)
+            )
+        
+        # Tags que optaram pelo cache de leitura do cliente ("cacheable": True);
+        # somente holding registers são armazenados pelo ModbusClientManager
+        self._cacheable_tags = {
+            tag_name for tag_name, tag_config in REGISTER_MAP.items()
+            if tag_config.get("cacheable") and self._tags[tag_name][2] == "holding"
+        }
+        
+        # Leituras agrupadas em faixas contíguas usadas por read_all_tags:
+        # (tipo de registro, início, quantidade, tags, cacheable). As tags com
+        # cache são planejadas à parte, para que uma faixa armazenada nunca
+        # inclua uma tag volátil
+        positions = {tag_name: tag[0] for tag_name, tag in self._tags.items()}
+        volatile_map = {
+            tag_name: tag_config for tag_name, tag_config in REGISTER_MAP.items()
+            if tag_name not in self._cacheable_tags
+        }
+        self._read_plans = [(*plan, False) for plan in plan_reads(volatile_map, positions)]
+        if self._cacheable_tags:
+            cacheable_map = {tag_name: REGISTER_MAP[tag_name] for tag_name in self._cacheable_tags}
+            self._read_plans.extend((*plan, True) for plan in plan_reads(cacheable_map, positions))
+        
+        # Método de leitura correspondente a cada tipo de registro
+        self._readers = {
+            "holding": client_manager.read_holding_registers,
+            "input": client_manager.read_input_registers,
+            "coil": client_manager.read_coils,
+            "discrete_input": client_manager.read_discrete_inputs
+        }
+        
+        # Funções de leitura, conversão e escrita especializadas para cada tag
+        self._converters = {}
+        self._tag_readers = {}
+        self._encoders = {}
+        self._writers = {}
+        for tag_name, tag in self._tags.items():
+            self._converters[tag_name] = self._make_converter(tag_name, tag)
+            self._tag_readers[tag_name] = self._make_reader(tag_name, tag)
+            encode = self._make_encoder(tag)
+            self._encoders[tag_name] = encode
+            self._writers[tag_name] = self._make_writer(tag, encode)
     
     def read_tag(self, tag_name):
         """
@@ -55,64 +126,320 @@ class ModbusDataHandler:
         Returns:
             O valor da tag ou None em caso de falha
         """
-        if tag_name not in REGISTER_MAP:
-            logger.error(f"Tag {tag_name} não encontrada no mapeamento de registros")
+        reader = self._tag_readers.get(tag_name)
+        if reader is None:
+            logger.error("Tag %s não encontrada no mapeamento de registros", tag_name)
             return None
         
-        tag_config = REGISTER_MAP[tag_name]
-        address = tag_config["address"]
-        count = tag_config["count"]
-        register_type = tag_config.get("register_type", "holding")  # Tipo padrão é holding register
-        
-        # Leitura baseada no tipo de registro
-        if register_type == "input":
-            raw_value = self.client_manager.read_input_registers(address, count)
-        elif register_type == "coil":
-            raw_value = self.client_manager.read_coils(address, count)
-        elif register_type == "discrete_input":
-            raw_value = self.client_manager.read_discrete_inputs(address, count)
-        else:  # holding register (padrão)
-            # Usar a posição específica no vetor para ler o valor
-            position = self.tag_positions.get(tag_name, address)
-            raw_value = self.client_manager.read_holding_registers(position, count)
-        
-        if raw_value is None:
-            logger.error(f"Falha ao ler a tag {tag_name}")
-            return None
+        return reader()
+    
+    def _make_reader(self, tag_name, tag):
+        """
+        Cria a função que lê uma tag, com endereço, quantidade e método de leitura já resolvidos.
         
-        # Converter o valor bruto para o tipo apropriado
-        try:
-            if tag_config["type"] == "bool" or register_type in ["coil", "discrete_input"]:
-                # Para coils e discrete inputs, retornamos diretamente o valor booleano
-                return raw_value[0] if count == 1 else raw_value
-            elif tag_config["type"] == "uint16":
-                # Para registros de 16 bits, retornamos o valor inteiro
-                return raw_value[0] if count == 1 else raw_value
-            elif tag_config["type"] == "float":
-                # Para valores de ponto flutuante, aplicamos a escala se definida
-                scale = tag_config.get("scale", 1.0)
-                value = raw_value[0] if count == 1 else raw_value
-                return value * scale
-            else:
+        Args:
+            tag_name (str): Nome da tag
+            tag (tuple): Configuração pré-calculada da tag (ver self._tags)
+            
+        Returns:
+            function: Função sem argumentos que retorna o valor da tag ou None em caso de falha
+        """
+        position, count, register_type, _, _ = tag
+        cacheable = tag_name in self._cacheable_tags
+        
+        def read_value():
+            raw_value = self._read_range(register_type, position, count, cacheable)
+            if raw_value is None:
+                logger.error("Falha ao ler a tag %s", tag_name)
+                return None
+            return self._convert_value(tag_name, raw_value)
+        return read_value
+    
+    def _read_range(self, register_type, address, count, cacheable=False):
+        """
+        Lê uma faixa de registros do tipo informado.
+        
+        Args:
+            register_type (str): "holding", "input", "coil" ou "discrete_input"
+            address (int): Endereço inicial
+            count (int): Número de registros a serem lidos
+            cacheable (bool): Permite atender a leitura pelo cache do cliente
+                (apenas holding registers)
+            
+        Returns:
+            list: Valores brutos lidos ou None em caso de falha
+        """
+        if cacheable:
+            return self.client_manager.read_holding_registers(address, count, cacheable=True)
+        # Leitura baseada no tipo de registro (holding register é o padrão)
+        reader = self._readers.get(register_type, self._readers["holding"])
+        return reader(address, count)
+    
+    def _make_converter(self, tag_name, tag):
+        """
+        Cria a função que converte os valores brutos de uma tag para o tipo apropriado.
+        
+        Args:
+            tag_name (str): Nome da tag
+            tag (tuple): Configuração pré-calculada da tag (ver self._tags)
+            
+        Returns:
+            function: Função que recebe a lista de valores brutos e retorna o valor convertido
+        """
+        _, count, register_type, data_type, scale = tag
+        
+        if data_type in ("bool", "uint16") or register_type in ("coil", "discrete_input"):
+            # Para booleanos, coils, discrete inputs e registros de 16 bits,
+            # retornamos diretamente o valor lido
+            return operator.itemgetter(0) if count == 1 else list
+        elif data_type == "float":
+            # Para valores de ponto flutuante, aplicamos a escala se definida
+            if count == 1:
+                return lambda raw_value: raw_value[0] * scale
+            return lambda raw_value: [value * scale for value in raw_value]
+        elif data_type in DECODERS:
+            # Demais tipos (int16, uint32, int32, float32) usam o conversor da tabela
+            return DECODERS[data_type]
+        else:
+            def convert_unknown(raw_value):
                 # Tipo desconhecido, retornar valor bruto
-                logger.warning(f"Tipo de dados desconhecido para a tag {tag_name}: {tag_config['type']}")
+                logger.warning("Tipo de dados desconhecido para a tag %s: %s", tag_name, data_type)
                 return raw_value
+            return convert_unknown
+    
+    def _convert_value(self, tag_name, raw_value):
+        """
+        Converte os valores brutos de uma tag para o tipo apropriado.
+        
+        Args:
+            tag_name (str): Nome da tag
+            raw_value (list): Valores brutos lidos para a tag
+            
+        Returns:
+            O valor convertido da tag ou None em caso de falha
+        """
+        try:
+            return self._converters[tag_name](raw_value)
         except Exception as e:
-            logger.exception(f"Erro ao converter valor para a tag {tag_name}: {e}")
+            logger.exception("Erro ao converter valor para a tag %s: %s", tag_name, e)
             return None
     
     def read_all_tags(self):
         """
         Lê todas as tags definidas no mapeamento de registros.
         
+        As tags do mesmo tipo de registro em endereços contíguos são lidas com
+        uma única requisição por faixa, em vez de uma requisição por tag; as
+        faixas são planejadas uma única vez (ver plan_reads).
+        
+        Com cache_ttl positivo, chamadas repetidas dentro desse intervalo reutilizam
+        a última leitura sem acessar o dispositivo; qualquer escrita feita por este
+        manipulador descarta a leitura armazenada ao terminar, e uma leitura em
+        andamento durante a escrita não é armazenada.
+        
         Returns:
             dict: Dicionário com os valores de todas as tags
         """
-        result = {}
-        for tag_name in REGISTER_MAP:
-            result[tag_name] = self.read_tag(tag_name)
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            generation = self._snapshot_generation
+        if snapshot is not None:
+            timestamp, cached_values = snapshot
+            if time.monotonic() - timestamp < self.cache_ttl:
+                logger.debug("Leitura das tags atendida pelo cache")
+                return dict(cached_values)
+        
+        values = {}
+        for register_type, start, count, members, cacheable in self._read_plans:
+            self._store_values(members, self._read_range(register_type, start, count, cacheable), values)
+        
+        # Manter a ordem do mapeamento de registros no resultado
+        result = {tag_name: values.get(tag_name) for tag_name in self._tags}
+        if self.cache_ttl > 0:
+            with self._snapshot_lock:
+                if self._snapshot_generation == generation:
+                    self._snapshot = (time.monotonic(), dict(result))
         return result
-      
+    
+    def _store_values(self, members, raw_values, values):
+        """
+        Converte os valores brutos de uma faixa lida nos valores de cada tag.
+        
+        Args:
+            members (list): Tags da faixa: tuplas (nome da tag, deslocamento, quantidade)
+            raw_values (list): Valores brutos da faixa ou None se a leitura falhou
+            values (dict): Dicionário onde os valores convertidos são registrados
+        """
+        for tag_name, offset, tag_count in members:
+            if raw_values is None:
+                logger.error("Falha ao ler a tag %s", tag_name)
+                values[tag_name] = None
+            else:
+                values[tag_name] = self._convert_value(tag_name, raw_values[offset:offset + tag_count])
+    
+    def invalidate_cache(self):
+        """Descarta a última leitura armazenada, forçando uma nova leitura do dispositivo."""
+        with self._snapshot_lock:
+            self._snapshot_generation += 1
+            self._snapshot = None
+    
+    async def read_all_tags_async(self, async_client_manager):
+        """
+        Lê todas as tags com um ModbusAsyncClientManager, submetendo as faixas concorrentemente.
+        
+        Utiliza as mesmas faixas planejadas de read_all_tags, enviadas de uma só vez
+        com read_many. A leitura armazenada por cache_ttl não é usada nem atualizada.
+        
+        Args:
+            async_client_manager (ModbusAsyncClientManager): Gerenciador de cliente assíncrono
+            
+        Returns:
+            dict: Dicionário com os valores de todas as tags
+        """
+        specs = [(register_type, start, count) for register_type, start, count, _, _ in self._read_plans]
+        raw_results = await async_client_manager.read_many(specs)
+        
+        values = {}
+        for plan, raw_values in zip(self._read_plans, raw_results):
+            self._store_values(plan[3], raw_values, values)
+        
+        # Manter a ordem do mapeamento de registros no resultado
+        return {tag_name: values.get(tag_name) for tag_name in self._tags}
+    
+    async def write_contiguous_tags_async(self, async_client_manager, tags_values):
+        """
+        Versão assíncrona de write_contiguous_tags para um ModbusAsyncClientManager.
+        
+        Cada sequência de holding registers contíguos é uma requisição, e todas são
+        submetidas concorrentemente com write_many, junto com as escritas das tags
+        de coils (write_coil), como no caminho síncrono; tags de outros tipos de
+        registro são registradas como falha. As lacunas entre as
+        sequências nunca são preenchidas, pois o cliente assíncrono não mantém um
+        lock entre a leitura e a escrita (ver fill_gaps em write_contiguous_tags).
+        
+        Args:
+            async_client_manager (ModbusAsyncClientManager): Gerenciador de cliente assíncrono
+            tags_values (dict): Dicionário com os nomes das tags e seus valores
+            
+        Returns:
+            dict: Dicionário com os resultados das operações de escrita
+        """
+        results = {}
+        runs, others = self._plan_writes(tags_values, results)
+        coil_tags = []
+        for tag_name in others:
+            tag = self._tags.get(tag_name)
+            if tag is None:
+                logger.error("Tag %s não encontrada no mapeamento de registros", tag_name)
+                results[tag_name] = False
+            elif tag[2] == "coil":
+                coil_tags.append(tag_name)
+            else:
+                logger.error("Tipo de registro não suportado para escrita: %s", tag[2])
+                results[tag_name] = False
+        
+        specs = [(run[0][0], [value for _, _, registers in run for value in registers]) for run in runs]
+        coil_writes = [
+            async_client_manager.write_coil(self._tags[tag_name][0], bool(tags_values[tag_name]))
+            for tag_name in coil_tags
+        ]
+        try:
+            outcomes, coil_outcomes = await asyncio.gather(
+                async_client_manager.write_many(specs),
+                asyncio.gather(*coil_writes, return_exceptions=True)
+            )
+        finally:
+            self.invalidate_cache()
+        for run, success in zip(runs, outcomes):
+            for _, tag_name, _ in run:
+                results[tag_name] = success
+        for tag_name, success in zip(coil_tags, coil_outcomes):
+            results[tag_name] = success is True
+        return results
+    
+    def _make_encoder(self, tag):
+        """
+        Cria a função que converte um valor Python nos registros a serem escritos em holding registers.
+        
+        A função é especializada para o tipo de dado da tag, de modo que a escolha
+        da conversão é feita uma única vez, e não a cada escrita.
+        
+        Args:
+            tag (tuple): Configuração pré-calculada da tag (ver self._tags)
+            
+        Returns:
+            function: Função que recebe o valor e retorna a lista de registros a ser
+                escrita a partir da posição da tag, ou None se o tipo de dados não
+                for suportado
+        """
+        _, count, _, data_type, scale = tag
+        
+        if data_type == "bool":
+            # Para valores booleanos em holding registers, escrevemos 1 ou 0
+            return lambda value: [1 if value else 0]
+        elif data_type == "uint16":
+            # Converter para inteiro apenas quando o valor ainda não é um int
+            return lambda value: [value if type(value) is int else int(value)]
+        elif data_type == "float":
+            def encode_float(value):
+                # Aplicar a escala corretamente: multiplicar pelo inverso da escala
+                int_value = int(float(value) / scale)
+                logger.debug("Escrevendo valor float %s com escala %s, valor convertido: %s", value, scale, int_value)
+                return [int_value]
+            return encode_float
+        elif data_type in ENCODERS:
+            # Demais tipos (int16, uint32, int32, float32) usam o conversor da tabela,
+            # simétrico ao usado na leitura; os de 32 bits ocupam dois registros
+            encode = ENCODERS[data_type]
+            def encode_registers(value):
+                registers = encode(value)
+                if registers is None:
+                    return None
+                if type(registers) is int:
+                    registers = [registers]
+                if len(registers) != count:
+                    logger.error("Tipo %s ocupa %d registro(s), mas a tag define count=%d",
+                                 data_type, len(registers), count)
+                    return None
+                return registers
+            return encode_registers
+        else:
+            def encode_unsupported(value):
+                logger.error("Tipo de dados não suportado para escrita: %s", data_type)
+                return None
+            return encode_unsupported
+    
+    def _make_writer(self, tag, encode):
+        """
+        Cria a função que escreve um valor em uma tag, especializada para o tipo de registro.
+        
+        Args:
+            tag (tuple): Configuração pré-calculada da tag (ver self._tags)
+            encode (function): Função de conversão criada por _make_encoder
+            
+        Returns:
+            function: Função que recebe o valor e retorna True se a escrita foi bem-sucedida
+        """
+        position, _, register_type, _, _ = tag
+        client_manager = self.client_manager
+        
+        if register_type == "coil":
+            # Converter para booleano para coils
+            return lambda value: client_manager.write_coil(position, bool(value))
+        elif register_type == "holding":
+            def write_holding(value):
+                registers = encode(value)
+                if registers is None:
+                    return False
+                # write_registers usa FC6 automaticamente quando há um único registro
+                return client_manager.write_registers(position, registers)
+            return write_holding
+        else:
+            def write_unsupported(value):
+                logger.error("Tipo de registro não suportado para escrita: %s", register_type)
+                return False
+            return write_unsupported
+    
     def write_tag(self, tag_name, value):
         """
         Escreve um valor em uma tag específica.
@@ -124,51 +451,21 @@ class ModbusDataHandler:
         Returns:
             bool: True se a operação foi bem-sucedida, False caso contrário
         """
-        if tag_name not in REGISTER_MAP:
-            logger.error(f"Tag {tag_name} não encontrada no mapeamento de registros")
+        writer = self._writers.get(tag_name)
+        if writer is None:
+            logger.error("Tag %s não encontrada no mapeamento de registros", tag_name)
             return False
         
-        tag_config = REGISTER_MAP[tag_name]
-        address = tag_config["address"]
-        register_type = tag_config.get("register_type", "holding")
-        
-        # Conversão do valor para o formato apropriado
+        # Conversão do valor para o formato apropriado e escrita; a leitura armazenada
+        # é descartada depois da escrita, para que uma leitura concorrente iniciada
+        # antes dela não volte a ser armazenada
         try:
-            if register_type == "coil":
-                # Converter para booleano para coils
-                bool_value = bool(value)
-                return self.client_manager.write_coil(address, bool_value)
-            elif register_type == "holding":
-                # Usar a posição específica no vetor para escrever o valor
-                position = self.tag_positions.get(tag_name, address)
-                
-                # Verificar o tipo de dado para o holding register
-                data_type = tag_config.get("type", "uint16")
-                
-                if data_type == "bool":
-                    # Para valores booleanos em holding registers, escrevemos 1 ou 0
-                    int_value = 1 if bool(value) else 0
-                    return self.client_manager.write_register(position, int_value)
-                elif data_type == "uint16":
-                    # Converter para inteiro para registros
-                    int_value = int(value)
-                    return self.client_manager.write_register(position, int_value)
-                elif data_type == "float":
-                    # Converter float para o formato apropriado
-                    scale = tag_config.get("scale", 1.0)
-                    # Aplicar a escala corretamente: multiplicar pelo inverso da escala
-                    int_value = int(float(value) / scale)
-                    logger.debug(f"Escrevendo valor float {value} com escala {scale}, valor convertido: {int_value}")
-                    return self.client_manager.write_register(position, int_value)
-                else:
-                    logger.error(f"Tipo de dados não suportado para escrita: {data_type}")
-                    return False
-            else:
-                logger.error(f"Tipo de registro não suportado para escrita: {register_type}")
-                return False
+            return writer(value)
         except Exception as e:
-            logger.exception(f"Erro ao converter valor para escrita na tag {tag_name}: {e}")
+            logger.exception("Erro ao converter valor para escrita na tag %s: %s", tag_name, e)
             return False
+        finally:
+            self.invalidate_cache()
     
     def write_multiple_tags(self, tags_values):
         """
@@ -184,3 +481,140 @@ class ModbusDataHandler:
         for tag_name, value in tags_values.items():
             results[tag_name] = self.write_tag(tag_name, value)
         return results
+    
+    def write_contiguous_tags(self, tags_values, fill_gaps=False):
+        """
+        Escreve valores em múltiplas tags agrupando holding registers contíguos.
+        
+        As tags de holding registers em posições consecutivas do vetor são escritas
+        com uma única requisição write_registers (FC16) por sequência, em vez de uma
+        requisição write_register (FC6) por tag. Tags de outros tipos de registro
+        são escritas individualmente com write_tag.
+        
+        Com fill_gaps=True, sequências separadas por registros que não foram
+        solicitados são enviadas em uma única escrita: a faixa é lida logo antes,
+        sob o lock do gerenciador, e as lacunas recebem o valor recém-lido (ver
+        ModbusClientManager.update_registers). Como um valor alterado pelo CLP entre
+        a leitura e a escrita seria sobrescrito, o padrão é escrever apenas os
+        registros solicitados. Se a faixa exceder os limites do protocolo, as
+        sequências são escritas separadamente, como sem fill_gaps.
+        
+        Args:
+            tags_values (dict): Dicionário com os nomes das tags e seus valores
+            fill_gaps (bool): Agrupa em uma única escrita as sequências não contíguas
+            
+        Returns:
+            dict: Dicionário com os resultados das operações de escrita
+        """
+        results = {}
+        runs, others = self._plan_writes(tags_values, results)
+        for tag_name in others:
+            results[tag_name] = self.write_tag(tag_name, tags_values[tag_name])
+        if fill_gaps and len(runs) > 1 and self._span_within_limits(runs):
+            self._write_span(runs, results)
+        else:
+            for run in runs:
+                self._write_run(run, results)
+        return results
+    
+    def _plan_writes(self, tags_values, results):
+        """
+        Converte os valores das tags e os agrupa em sequências de holding registers contíguos.
+        
+        Args:
+            tags_values (dict): Dicionário com os nomes das tags e seus valores
+            results (dict): Dicionário onde as tags com falha na conversão são registradas
+            
+        Returns:
+            tuple: (sequências, outras), onde sequências é uma lista de listas de
+                tuplas (posição, nome da tag, registros) e outras é a lista das tags
+                que não são holding registers (ou não constam do mapeamento)
+        """
+        encoded = []
+        others = []
+        for tag_name, value in tags_values.items():
+            tag = self._tags.get(tag_name)
+            if tag is None or tag[2] != "holding":
+                others.append(tag_name)
+                continue
+            
+            try:
+                registers = self._encoders[tag_name](value)
+            except Exception as e:
+                logger.exception("Erro ao converter valor para escrita na tag %s: %s", tag_name, e)
+                registers = None
+            if registers is None:
+                results[tag_name] = False
+                continue
+            
+            encoded.append((tag[0], tag_name, registers))
+        
+        # Agrupar as tags em sequências de registros consecutivos, escritas cada uma
+        # de uma vez; uma tag continua a sequência quando começa logo após o último
+        # registro da tag anterior
+        encoded.sort(key=operator.itemgetter(0))
+        runs = []
+        for item in encoded:
+            if runs and item[0] == runs[-1][-1][0] + len(runs[-1][-1][2]):
+                runs[-1].append(item)
+            else:
+                runs.append([item])
+        return runs, others
+    
+    def _write_run(self, run, results):
+        """
+        Escreve uma sequência de holding registers contíguos em uma única requisição.
+        
+        Args:
+            run (list): Lista de tuplas (posição, nome da tag, registros) ordenadas por posição
+            results (dict): Dicionário onde o resultado de cada tag é registrado
+        """
+        start = run[0][0]
+        values = [value for _, _, registers in run for value in registers]
+        # write_registers usa FC6 automaticamente quando há um único valor
+        try:
+            success = self.client_manager.write_registers(start, values)
+        finally:
+            self.invalidate_cache()
+        for _, tag_name, _ in run:
+            results[tag_name] = success
+    
+    def _span_within_limits(self, runs):
+        """
+        Verifica se a faixa que cobre todas as sequências cabe em uma leitura e em uma escrita.
+        
+        Args:
+            runs (list): Sequências ordenadas por posição, como retornadas por _plan_writes
+            
+        Returns:
+            bool: True se a faixa respeita os limites do protocolo (125 registros por
+                leitura e 123 por escrita FC16); caso contrário as sequências são
+                escritas separadamente
+        """
+        last = runs[-1][-1]
+        span = last[0] + len(last[2]) - runs[0][0][0]
+        if span > min(MAX_READ_COUNT["holding"], MAX_WRITE_COUNT):
+            logger.debug("Faixa de %d registros excede o limite do protocolo; escrevendo as sequências separadamente", span)
+            return False
+        return True
+    
+    def _write_span(self, runs, results):
+        """
+        Escreve várias sequências em uma única requisição, preenchendo as lacunas com uma leitura prévia.
+        
+        Args:
+            runs (list): Sequências ordenadas por posição, como retornadas por _plan_writes
+            results (dict): Dicionário onde o resultado de cada tag é registrado
+        """
+        updates = {
+            position + offset: value
+            for run in runs for position, _, registers in run
+            for offset, value in enumerate(registers)
+        }
+        try:
+            success = self.client_manager.update_registers(runs[0][0][0], updates)
+        finally:
+            self.invalidate_cache()
+        for run in runs:
+            for _, tag_name, _ in run:
+                results[tag_name] = success
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Módulo para leitura periódica das tags Modbus em segundo plano.
+"""
+
+import logging
+import threading
+import time
+from src.config import POLL_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+class ModbusPoller:
+    """
+    Classe para leitura periódica das tags em uma thread de segundo plano.
+    
+    A thread lê todas as tags pelo ModbusDataHandler a cada intervalo e guarda
+    o resultado em uma cópia protegida por lock. Interfaces (ex.: uma UI) consultam
+    essa cópia com snapshot() sem aguardar a comunicação com o dispositivo, de modo
+    que uma leitura lenta ou travada não bloqueia quem exibe os valores.
+    """
+    
+    def __init__(self, handler, interval=POLL_INTERVAL):
+        """
+        Inicializa o leitor periódico.
+        
+        Args:
+            handler (ModbusDataHandler): Manipulador de dados usado nas leituras
+            interval (float): Intervalo entre leituras em segundos
+        """
+        self.handler = handler
+        self.interval = interval
+        self._lock = threading.Lock()
+        # Cada thread recebe seu próprio evento de parada, para que uma thread que
+        # ainda não terminou após stop() não seja reativada por um novo start()
+        self._stop_event = None
+        self._thread = None
+        # Última leitura bem-sucedida (valores e instante time.monotonic) e estado da conexão
+        self._values = {}
+        self._timestamp = None
+        self._connected = False
+    
+    def start(self):
+        """
+        Inicia a thread de leitura, caso ainda não esteja em execução.
+        
+        Returns:
+            bool: True se a thread foi iniciada, False se já estava em execução
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop_event,),
+                                        name="modbus-poller", daemon=True)
+        self._thread.start()
+        logger.info("Leitura periódica das tags iniciada (intervalo de %.1fs)", self.interval)
+        return True
+    
+    def stop(self, timeout=None):
+        """
+        Sinaliza o fim da leitura periódica e aguarda o término da thread.
+        
+        Args:
+            timeout (float): Tempo máximo de espera em segundos (None aguarda indefinidamente)
+        """
+        if self._thread is None:
+            # start() nunca foi chamado ou a leitura já foi encerrada
+            return
+        self._stop_event.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            # A thread termina sozinha ao concluir a leitura em andamento, sem
+            # registrar o resultado, pois seu evento de parada já está sinalizado
+            logger.warning("Leitura periódica ainda em andamento após %.1fs; a thread será encerrada ao concluí-la", timeout)
+        else:
+            logger.info("Leitura periódica das tags encerrada")
+        self._thread = None
+        self._stop_event = None
+    
+    def snapshot(self):
+        """
+        Obtém a última leitura das tags sem acessar o dispositivo.
+        
+        Returns:
+            tuple: (valores, instante, conectado), onde valores é um dicionário com
+                os valores das tags, instante é o time.monotonic() da última leitura
+                bem-sucedida (None se nenhuma foi concluída) e conectado indica se
+                a leitura mais recente obteve resposta do dispositivo
+        """
+        with self._lock:
+            return dict(self._values), self._timestamp, self._connected
+    
+    def _run(self, stop_event):
+        """
+        Executa as leituras em intervalos fixos até que stop() seja chamado.
+        
+        Args:
+            stop_event (threading.Event): Evento de parada exclusivo desta thread
+        """
+        while not stop_event.is_set():
+            try:
+                values = self.handler.read_all_tags()
+                # Sem nenhum valor lido, o dispositivo é considerado desconectado
+                connected = any(value is not None for value in values.values())
+            except Exception as e:
+                logger.exception("Erro na leitura periódica das tags: %s", e)
+                values = {}
+                connected = False
+            
+            with self._lock:
+                # Uma leitura concluída depois de stop() é descartada, para não
+                # sobrescrever os valores de uma thread iniciada em seguida
+                if stop_event.is_set():
+                    break
+                # Em caso de falha, os últimos valores lidos são mantidos
+                if connected:
+                    self._values = values
+                    self._timestamp = time.monotonic()
+                self._connected = connected
+            
+            stop_event.wait(self.interval)
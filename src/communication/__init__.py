@@ -8,5 +8,8 @@ Este pacote contém classes e funções para comunicação com dispositivos Modb
 """
 
 from src.communication.modbus_client import ModbusClientManager
+from src.communication.async_modbus_client import ModbusAsyncClientManager
+from src.communication.async_pool import ModbusClientPool
+from src.communication.pool import get_client_manager, close_all_client_managers
 
-__all__ = ['ModbusClientManager']
+__all__ = ['ModbusClientManager', 'ModbusAsyncClientManager', 'ModbusClientPool', 'get_client_manager', 'close_all_client_managers']
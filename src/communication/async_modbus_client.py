@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Módulo para gerenciamento de cliente Modbus TCP assíncrono.
+"""
+
+import asyncio
+import logging
+from pymodbus.client import AsyncModbusTcpClient
+from pymodbus.exceptions import ModbusException
+from src.communication.retry import CONNECTION_ERRORS, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Método do cliente pymodbus correspondente a cada tipo de registro do REGISTER_MAP
+READ_METHODS = {
+    "holding": "read_holding_registers",
+    "input": "read_input_registers",
+    "coil": "read_coils",
+    "discrete_input": "read_discrete_inputs"
+}
+
+class ModbusAsyncClientManager:
+    """
+    Classe para gerenciar a comunicação Modbus TCP de forma assíncrona.
+    
+    Oferece a mesma interface de leitura e escrita do ModbusClientManager, mas
+    baseada no AsyncModbusTcpClient do pymodbus, de modo que a espera pela rede
+    não bloqueia o loop de eventos da aplicação.
+    
+    O asyncio já habilita TCP_NODELAY nos sockets TCP que cria, portanto não é
+    necessário ajustar o socket após a conexão como no cliente síncrono.
+    """
+    
+    def __init__(self, host, port=502, timeout=3.0, retry_count=3, retry_delay=1.0, unit=1,
+                 retry_cap=10.0, retry_jitter=True):
+        """
+        Inicializa o gerenciador de cliente Modbus assíncrono.
+        
+        Args:
+            host (str): Endereço IP ou hostname do servidor Modbus
+            port (int): Porta TCP do servidor Modbus (padrão: 502)
+            timeout (float): Tempo limite para operações em segundos
+            retry_count (int): Número de tentativas de reconexão
+            retry_delay (float): Atraso base entre tentativas em segundos
+            unit (int): ID da unidade/slave (padrão: 1)
+            retry_cap (float): Atraso máximo entre tentativas em segundos
+            retry_jitter (bool): Sorteia o atraso entre zero e o valor exponencial,
+                evitando que clientes que perderam a conexão juntos tentem
+                reconectar ao mesmo tempo
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.retry_count = retry_count
+        self.retry_delay = retry_delay
+        self.unit = unit
+        self.retry_cap = retry_cap
+        self.retry_jitter = retry_jitter
+        self.client = None
+        # Evita que leituras concorrentes abram conexões em paralelo
+        self._connect_lock = asyncio.Lock()
+    
+    async def connect(self):
+        """
+        Estabelece conexão com o servidor Modbus.
+        
+        A instância de AsyncModbusTcpClient é criada apenas na primeira chamada e
+        reutilizada nas reconexões seguintes. Chamadas concorrentes aguardam a
+        conexão em andamento em vez de abrir outra.
+        
+        Returns:
+            bool: True se a conexão foi estabelecida com sucesso, False caso contrário
+        """
+        async with self._connect_lock:
+            if self.client is not None and self.client.connected:
+                return True
+            try:
+                logger.info("Conectando ao servidor Modbus em %s:%s", self.host, self.port)
+                if self.client is None:
+                    # As novas tentativas são controladas por _execute_with_retry;
+                    # sem retries=0 o pymodbus repetiria cada requisição sem
+                    # resposta, multiplicando o tempo de espera por um CLP inacessível
+                    self.client = AsyncModbusTcpClient(
+                        host=self.host,
+                        port=self.port,
+                        timeout=self.timeout,
+                        retries=0
+                    )
+                connected = await self.client.connect()
+                if connected:
+                    logger.info("Conexão estabelecida com sucesso")
+                    return True
+                else:
+                    logger.error("Falha ao conectar ao servidor Modbus")
+                    return False
+            except Exception as e:
+                logger.exception("Erro ao conectar ao servidor Modbus: %s", e)
+                return False
+    
+    def disconnect(self):
+        """
+        Encerra a conexão com o servidor Modbus.
+        
+        Returns:
+            bool: True se a desconexão foi bem-sucedida, False caso contrário
+        """
+        if self.client and self.client.connected:
+            self.client.close()
+            logger.info("Conexão Modbus encerrada")
+            return True
+        return False
+    
+    async def _execute_with_retry(self, method_name, *args, **kwargs):
+        """
+        Executa uma operação Modbus com tentativas de reconexão em caso de falha.
+        
+        O método do cliente é resolvido pelo nome somente após a conexão, pois a
+        instância do AsyncModbusTcpClient é criada no primeiro connect(). Como no
+        cliente síncrono, a reconexão ocorre apenas nas falhas da própria conexão
+        (ver CONNECTION_ERRORS).
+        
+        Args:
+            method_name (str): Nome do método do AsyncModbusTcpClient a ser executado
+            *args: Argumentos posicionais para o método
+            **kwargs: Argumentos nomeados para o método
+        
+        Returns:
+            O resultado da operação ou None em caso de falha
+        """
+        for attempt in range(self.retry_count + 1):
+            try:
+                if not self.client or not self.client.connected:
+                    logger.warning("Cliente não conectado. Tentando reconectar...")
+                    if not await self.connect():
+                        logger.error("Falha na reconexão")
+                        return None
+                
+                result = await getattr(self.client, method_name)(*args, **kwargs)
+                if result.isError():
+                    logger.error("Erro na operação Modbus: %s", result)
+                    return None
+                return result
+            
+            except CONNECTION_ERRORS as e:
+                logger.warning("Erro de conexão (tentativa %d/%d): %s", attempt + 1, self.retry_count + 1, e)
+                if attempt < self.retry_count:
+                    await asyncio.sleep(backoff_delay(attempt, self.retry_delay, self.retry_cap, self.retry_jitter))
+                    self.disconnect()
+                else:
+                    logger.error("Número máximo de tentativas excedido")
+                    return None
+            
+            except ModbusException as e:
+                logger.error("Erro Modbus: %s", e)
+                return None
+            
+            except Exception as e:
+                logger.exception("Erro inesperado: %s", e)
+                return None
+    
+    async def read_coils(self, address, count=1):
+        """
+        Lê o estado de coils (bobinas) do dispositivo Modbus.
+        
+        Args:
+            address (int): Endereço inicial dos coils
+            count (int): Número de coils a serem lidos
+        
+        Returns:
+            list: Lista de estados dos coils (True/False) ou None em caso de falha
+        """
+        logger.debug("Lendo %d coil(s) a partir do endereço %d", count, address)
+        result = await self._execute_with_retry("read_coils", address, count=count, slave=self.unit)
+        if result:
+            # O pymodbus completa os bits até um múltiplo de 8; a lista da resposta
+            # não é reutilizada, então o excesso é removido sem copiar os bits
+            bits = result.bits
+            del bits[count:]
+            return bits
+        return None
+    
+    async def read_discrete_inputs(self, address, count=1):
+        """
+        Lê o estado de entradas discretas do dispositivo Modbus.
+        
+        Args:
+            address (int): Endereço inicial das entradas
+            count (int): Número de entradas a serem lidas
+        
+        Returns:
+            list: Lista de estados das entradas (True/False) ou None em caso de falha
+        """
+        logger.debug("Lendo %d entrada(s) discreta(s) a partir do endereço %d", count, address)
+        result = await self._execute_with_retry("read_discrete_inputs", address, count=count, slave=self.unit)
+        if result:
+            bits = result.bits
+            del bits[count:]
+            return bits
+        return None
+    
+    async def read_holding_registers(self, address, count=1):
+        """
+        Lê valores de holding registers do dispositivo Modbus.
+        
+        Args:
+            address (int): Endereço inicial dos registros
+            count (int): Número de registros a serem lidos
+        
+        Returns:
+            list: Lista de valores dos registros ou None em caso de falha
+        """
+        logger.debug("Lendo %d holding register(s) a partir do endereço %d", count, address)
+        result = await self._execute_with_retry("read_holding_registers", address, count=count, slave=self.unit)
+        if result:
+            return result.registers
+        return None
+    
+    async def read_input_registers(self, address, count=1):
+        """
+        Lê valores de input registers do dispositivo Modbus.
+        
+        Args:
+            address (int): Endereço inicial dos registros
+            count (int): Número de registros a serem lidos
+        
+        Returns:
+            list: Lista de valores dos registros ou None em caso de falha
+        """
+        logger.debug("Lendo %d input register(s) a partir do endereço %d", count, address)
+        result = await self._execute_with_retry("read_input_registers", address, count=count, slave=self.unit)
+        if result:
+            return result.registers
+        return None
+    
+    async def read_many(self, specs):
+        """
+        Executa várias leituras concorrentemente com asyncio.gather.
+        
+        O pymodbus serializa as requisições de uma mesma conexão, portanto o
+        ganho está em submeter todas as leituras de uma só vez sem bloquear o
+        loop de eventos; para sobrepor as requisições na rede utilize conexões
+        distintas.
+        
+        Args:
+            specs (list): Lista de tuplas (register_type, address, count), onde
+                register_type é "holding", "input", "coil" ou "discrete_input"
+        
+        Returns:
+            list: Resultados na mesma ordem de specs (None nas leituras que falharam)
+        """
+        coros = [
+            getattr(self, READ_METHODS[register_type])(address, count)
+            for register_type, address, count in specs
+        ]
+        results = await asyncio.gather(*coros, return_exceptions=True)
+        return [None if isinstance(result, BaseException) else result for result in results]
+    
+    async def write_coil(self, address, value):
+        """
+        Escreve o estado de um coil no dispositivo Modbus.
+        
+        Args:
+            address (int): Endereço do coil
+            value (bool): Valor a ser escrito (True/False)
+        
+        Returns:
+            bool: True se a operação foi bem-sucedida, False caso contrário
+        """
+        logger.debug("Escrevendo valor %s no coil de endereço %d", value, address)
+        result = await self._execute_with_retry("write_coil", address, value, slave=self.unit)
+        return result is not None
+    
+    async def write_register(self, address, value):
+        """
+        Escreve um valor em um holding register do dispositivo Modbus.
+        
+        Args:
+            address (int): Endereço do registro
+            value (int): Valor a ser escrito (0-65535)
+        
+        Returns:
+            bool: True se a operação foi bem-sucedida, False caso contrário
+        """
+        logger.debug("Escrevendo valor %s no registro de endereço %d", value, address)
+        result = await self._execute_with_retry("write_register", address, value, slave=self.unit)
+        return result is not None
+    
+    async def write_registers(self, address, values):
+        """
+        Escreve valores em múltiplos holding registers do dispositivo Modbus.
+        
+        Um único valor é escrito com write_register (FC6), cuja requisição é menor
+        que a de escrita múltipla (FC16) e é tratada mais rapidamente por alguns CLPs.
+        
+        Args:
+            address (int): Endereço inicial dos registros
+            values (list): Lista de valores a serem escritos
+        
+        Returns:
+            bool: True se a operação foi bem-sucedida, False caso contrário
+        """
+        if len(values) == 1:
+            return await self.write_register(address, values[0])
+        logger.debug("Escrevendo %d valores a partir do endereço %d", len(values), address)
+        result = await self._execute_with_retry("write_registers", address, values, slave=self.unit)
+        return result is not None
+    
+    async def write_many(self, specs):
+        """
+        Executa várias escritas em holding registers concorrentemente com asyncio.gather.
+        
+        Assim como em read_many, o pymodbus serializa as requisições de uma mesma
+        conexão; para registros contíguos, uma única chamada a write_registers
+        (FC16) continua sendo a forma mais rápida de escrita.
+        
+        Args:
+            specs (list): Lista de tuplas (address, value), onde value é um inteiro
+                (escrito com write_register) ou uma lista de inteiros (escrita com
+                write_registers a partir de address)
+        
+        Returns:
+            list: Resultados (True/False) na mesma ordem de specs
+        """
+        coros = [
+            self.write_registers(address, value) if isinstance(value, (list, tuple))
+            else self.write_register(address, value)
+            for address, value in specs
+        ]
+        results = await asyncio.gather(*coros, return_exceptions=True)
+        return [result is True for result in results]
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Módulo para pool de conexões Modbus TCP assíncronas.
+"""
+
+import asyncio
+import contextlib
+import logging
+from src.communication.async_modbus_client import ModbusAsyncClientManager
+from src.config import MODBUS_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+class ModbusClientPool:
+    """
+    Classe para distribuir requisições concorrentes entre várias conexões Modbus TCP.
+    
+    Cada conexão é um ModbusAsyncClientManager próprio. Como o pymodbus serializa
+    as requisições de uma mesma conexão, chamadores concorrentes que obtêm
+    conexões distintas com acquire() têm suas requisições sobrepostas na rede,
+    desde que o servidor (ou o gateway TCP) aceite sessões simultâneas. Muitos
+    gateways limitam-se a 2-4 conexões, portanto o tamanho do pool deve respeitar
+    o limite do equipamento.
+    
+    Uso:
+        async with ModbusClientPool(host, port) as pool:
+            async with pool.acquire() as client:
+                registers = await client.read_holding_registers(0, 4)
+    """
+    
+    def __init__(self, host, port=502, size=MODBUS_POOL_SIZE, **kwargs):
+        """
+        Inicializa o pool de conexões.
+        
+        Args:
+            host (str): Endereço IP ou hostname do servidor Modbus
+            port (int): Porta TCP do servidor Modbus (padrão: 502)
+            size (int): Número de conexões do pool
+            **kwargs: Demais argumentos de ModbusAsyncClientManager (timeout,
+                retry_count, retry_delay, unit, retry_cap, retry_jitter)
+        """
+        if size < 1:
+            raise ValueError("O pool precisa de pelo menos uma conexão")
+        self.host = host
+        self.port = port
+        self.size = size
+        self._managers = [ModbusAsyncClientManager(host, port, **kwargs) for _ in range(size)]
+        # Conexões livres; acquire() aguarda enquanto todas estão em uso
+        self._idle = asyncio.Queue()
+        for manager in self._managers:
+            self._idle.put_nowait(manager)
+        # Encerra todas as conexões ao sair do bloco "async with" ou em close()
+        self._exit_stack = self._new_exit_stack()
+    
+    def _new_exit_stack(self):
+        """
+        Cria a pilha de encerramento com a desconexão de todas as conexões do pool.
+        
+        Returns:
+            contextlib.AsyncExitStack: Pilha a ser encerrada em close()
+        """
+        exit_stack = contextlib.AsyncExitStack()
+        for manager in self._managers:
+            exit_stack.callback(manager.disconnect)
+        return exit_stack
+    
+    async def connect(self):
+        """
+        Estabelece todas as conexões do pool concorrentemente.
+        
+        Conexões que falharem são refeitas sob demanda pelo próprio
+        ModbusAsyncClientManager na primeira requisição.
+        
+        Returns:
+            int: Número de conexões estabelecidas com sucesso
+        """
+        results = await asyncio.gather(*(manager.connect() for manager in self._managers))
+        connected = sum(1 for result in results if result)
+        logger.info("Pool Modbus: %d de %d conexão(ões) estabelecida(s)", connected, self.size)
+        return connected
+    
+    async def close(self):
+        """
+        Encerra todas as conexões do pool.
+        
+        Um AsyncExitStack só pode ser encerrado uma vez, portanto uma nova pilha é
+        criada em seguida: o pool pode ser reutilizado (as conexões são refeitas
+        sob demanda ou por connect()) e fechado novamente.
+        """
+        exit_stack, self._exit_stack = self._exit_stack, self._new_exit_stack()
+        await exit_stack.aclose()
+    
+    async def __aenter__(self):
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        """
+        Obtém uma conexão livre do pool pelo tempo de um bloco "async with".
+        
+        Ao devolver a conexão, é verificado se ela continua ativa; caso tenha
+        caído durante o uso, a reconexão é feita antes de recolocá-la na fila,
+        para que o próximo chamador não pague o custo da reconexão.
+        
+        Yields:
+            ModbusAsyncClientManager: Gerenciador de cliente de uso exclusivo do chamador
+        """
+        manager = await self._idle.get()
+        try:
+            yield manager
+        finally:
+            try:
+                if manager.client is None or not manager.client.connected:
+                    logger.warning("Conexão do pool inativa ao ser devolvida. Reconectando...")
+                    await manager.connect()
+            finally:
+                self._idle.put_nowait(manager)
@@ -6,21 +6,35 @@ Módulo para gerenciamento de cliente Modbus TCP.
 """
 
 import logging
+import socket
+import threading
 import time
 from pymodbus.client import ModbusTcpClient
-from pymodbus.exceptions import ConnectionException, ModbusException
+from pymodbus.exceptions import ModbusException
+from src.communication.retry import CONNECTION_ERRORS, backoff_delay
 
 logger = logging.getLogger(__name__)
 
+# Parâmetros do keepalive TCP: segundos de inatividade antes da primeira sonda,
+# intervalo entre sondas e número de sondas sem resposta até a queda da conexão
+KEEPALIVE_IDLE = 60
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_PROBES = 3
+
 class ModbusClientManager:
     """
     Classe para gerenciar a comunicação Modbus TCP com um dispositivo remoto.
     
     Esta classe encapsula as funcionalidades da biblioteca pymodbus para
     facilitar a comunicação com dispositivos Modbus TCP, como o CLP Mitsubishi FX5U.
+    
+    Uma mesma instância pode ser compartilhada entre threads: as operações são
+    serializadas por um lock, de modo que todos os chamadores utilizem uma única
+    conexão TCP com o dispositivo.
     """
     
-    def __init__(self, host, port=502, timeout=3.0, retry_count=3, retry_delay=1.0, unit=1):
+    def __init__(self, host, port=502, timeout=3.0, retry_count=3, retry_delay=1.0, unit=1,
+                 retry_cap=10.0, retry_jitter=True, cache_ttl=0.0):
         """
         Inicializa o gerenciador de cliente Modbus.
         
@@ -29,8 +43,14 @@ class ModbusClientManager:
             port (int): Porta TCP do servidor Modbus (padrão: 502)
             timeout (float): Tempo limite para operações em segundos
             retry_count (int): Número de tentativas de reconexão
-            retry_delay (float): Atraso entre tentativas em segundos
+            retry_delay (float): Atraso base entre tentativas em segundos
             unit (int): ID da unidade/slave (padrão: 1)
+            retry_cap (float): Atraso máximo entre tentativas em segundos
+            retry_jitter (bool): Sorteia o atraso entre zero e o valor exponencial,
+                evitando que clientes que perderam a conexão juntos tentem
+                reconectar ao mesmo tempo
+            cache_ttl (float): Validade em segundos das leituras de holding registers
+                feitas com cacheable=True (0 desabilita o cache)
         """
         self.host = host
         self.port = port
@@ -38,32 +58,104 @@ class ModbusClientManager:
         self.retry_count = retry_count
         self.retry_delay = retry_delay
         self.unit = unit
+        self.retry_cap = retry_cap
+        self.retry_jitter = retry_jitter
+        self.cache_ttl = cache_ttl
         self.client = None
+        # Leituras de holding registers armazenadas: (endereço, quantidade) -> (instante, valores)
+        self._read_cache = {}
+        # Instante (time.monotonic) da última falha de conexão, usado para
+        # limitar a frequência de reconexões automáticas
+        self._last_connect_failure = None
+        # Estado da conexão mantido pelo próprio gerenciador, evitando consultar
+        # o socket antes de cada operação; é desfeito apenas em falhas de conexão
+        self._connected = False
+        # Serializa conexão e operações entre threads que compartilham a instância
+        self._lock = threading.RLock()
     
     def connect(self):
         """
         Estabelece conexão com o servidor Modbus.
         
+        A instância de ModbusTcpClient é criada apenas na primeira chamada e
+        reutilizada nas reconexões seguintes, evitando realocar o cliente a
+        cada falha de comunicação. Se a conexão já estiver aberta, ela é
+        mantida sem um novo handshake TCP.
+        
         Returns:
             bool: True se a conexão foi estabelecida com sucesso, False caso contrário
         """
-        try:
-            logger.info(f"Conectando ao servidor Modbus em {self.host}:{self.port}")
-            self.client = ModbusTcpClient(
-                host=self.host,
-                port=self.port,
-                timeout=self.timeout
-            )
-            connected = self.client.connect()
-            if connected:
-                logger.info("Conexão estabelecida com sucesso")
+        with self._lock:
+            if self.client is not None and self.client.is_socket_open():
+                self._connected = True
                 return True
-            else:
-                logger.error("Falha ao conectar ao servidor Modbus")
+            try:
+                logger.info("Conectando ao servidor Modbus em %s:%s", self.host, self.port)
+                if self.client is None:
+                    # As novas tentativas são controladas por _execute_with_retry;
+                    # sem retries=0 o pymodbus repetiria cada requisição sem
+                    # resposta, multiplicando o tempo de espera por um CLP inacessível
+                    self.client = ModbusTcpClient(
+                        host=self.host,
+                        port=self.port,
+                        timeout=self.timeout,
+                        retries=0
+                    )
+                connected = self.client.connect()
+                if connected:
+                    self._tune_socket()
+                    self._connected = True
+                    self._last_connect_failure = None
+                    logger.info("Conexão estabelecida com sucesso")
+                    return True
+                else:
+                    self._last_connect_failure = time.monotonic()
+                    logger.error("Falha ao conectar ao servidor Modbus")
+                    return False
+            except Exception as e:
+                self._last_connect_failure = time.monotonic()
+                logger.exception("Erro ao conectar ao servidor Modbus: %s", e)
                 return False
-        except Exception as e:
-            logger.exception(f"Erro ao conectar ao servidor Modbus: {e}")
-            return False
+    
+    def _tune_socket(self):
+        """
+        Ajusta as opções do socket TCP logo após a conexão.
+        
+        Desabilita o algoritmo de Nagle (TCP_NODELAY) para que as requisições
+        Modbus, que são pequenas, sejam enviadas imediatamente em vez de
+        aguardarem o ACK da requisição anterior, e habilita o keepalive TCP
+        (SO_KEEPALIVE) para que uma conexão persistente inativa não seja
+        descartada silenciosamente. Onde o sistema operacional permite (ex.: Linux),
+        os intervalos do keepalive também são reduzidos, para que uma conexão
+        perdida seja detectada em minutos em vez de horas.
+        """
+        sock = self.client.socket
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_PROBES)
+        except OSError as e:
+            logger.warning("Não foi possível ajustar as opções do socket: %s", e)
+    
+    def _reconnect_suppressed(self):
+        """
+        Indica se uma reconexão automática deve ser evitada no momento.
+        
+        Após uma falha de conexão, novas tentativas automáticas só são feitas
+        depois de retry_delay segundos, evitando que operações consecutivas
+        repitam o handshake TCP (e aguardem o timeout) contra um servidor
+        indisponível.
+        
+        Returns:
+            bool: True se a última falha de conexão ocorreu há menos de retry_delay segundos
+        """
+        return (self._last_connect_failure is not None and
+                time.monotonic() - self._last_connect_failure < self.retry_delay)
     
     def disconnect(self):
         """
@@ -72,16 +164,22 @@ class ModbusClientManager:
         Returns:
             bool: True se a desconexão foi bem-sucedida, False caso contrário
         """
-        if self.client and self.client.is_socket_open():
-            self.client.close()
-            logger.info("Conexão Modbus encerrada")
-            return True
-        return False
+        with self._lock:
+            self._connected = False
+            if self.client and self.client.is_socket_open():
+                self.client.close()
+                logger.info("Conexão Modbus encerrada")
+                return True
+            return False
     
     def _execute_with_retry(self, operation_func, *args, **kwargs):
         """
         Executa uma operação Modbus com tentativas de reconexão em caso de falha.
         
+        A reconexão ocorre apenas em falhas da própria conexão (ConnectionException,
+        conexão reiniciada ou encerrada pelo dispositivo); erros Modbus, como
+        respostas de exceção, não derrubam a conexão persistente.
+        
         Args:
             operation_func: Função de operação Modbus a ser executada
             *args: Argumentos posicionais para a função
@@ -90,36 +188,43 @@ class ModbusClientManager:
         Returns:
             O resultado da operação ou None em caso de falha
         """
-        for attempt in range(self.retry_count + 1):
-            try:
-                if not self.client or not self.client.is_socket_open():
-                    logger.warning("Cliente não conectado. Tentando reconectar...")
-                    if not self.connect():
-                        logger.error("Falha na reconexão")
+        with self._lock:
+            for attempt in range(self.retry_count + 1):
+                try:
+                    if not self._connected:
+                        if self._reconnect_suppressed():
+                            logger.debug("Reconexão ignorada: última falha de conexão há menos de %.1fs", self.retry_delay)
+                            return None
+                        logger.warning("Cliente não conectado. Tentando reconectar...")
+                        if not self.connect():
+                            logger.error("Falha na reconexão")
+                            return None
+                
+                    result = operation_func(*args, **kwargs)
+                    # Todas as respostas do pymodbus 3.x implementam isError(),
+                    # inclusive as respostas de exceção
+                    if result.isError():
+                        logger.error("Erro na operação Modbus: %s", result)
                         return None
+                    return result
                 
-                result = operation_func(*args, **kwargs)
-                if hasattr(result, 'isError') and result.isError():
-                    logger.error(f"Erro na operação Modbus: {result}")
+                except CONNECTION_ERRORS as e:
+                    self._connected = False
+                    logger.warning("Erro de conexão (tentativa %d/%d): %s", attempt + 1, self.retry_count + 1, e)
+                    if attempt < self.retry_count:
+                        time.sleep(backoff_delay(attempt, self.retry_delay, self.retry_cap, self.retry_jitter))
+                        self.disconnect()
+                    else:
+                        logger.error("Número máximo de tentativas excedido")
+                        return None
+                    
+                except ModbusException as e:
+                    logger.error("Erro Modbus: %s", e)
                     return None
-                return result
                 
-            except ConnectionException as e:
-                logger.warning(f"Erro de conexão (tentativa {attempt+1}/{self.retry_count+1}): {e}")
-                if attempt < self.retry_count:
-                    time.sleep(self.retry_delay)
-                    self.disconnect()
-                else:
-                    logger.error("Número máximo de tentativas excedido")
+                except Exception as e:
+                    logger.exception("Erro inesperado: %s", e)
                     return None
-                    
-            except ModbusException as e:
-                logger.error(f"Erro Modbus: {e}")
-                return None
-                
-            except Exception as e:
-                logger.exception(f"Erro inesperado: {e}")
-                return None
     
     def read_coils(self, address, count=1):
         """
@@ -132,7 +237,7 @@ class ModbusClientManager:
         Returns:
             list: Lista de estados dos coils (True/False) ou None em caso de falha
         """
-        logger.debug(f"Lendo {count} coil(s) a partir do endereço {address}")
+        logger.debug("Lendo %d coil(s) a partir do endereço %d", count, address)
         # Usando kwargs para compatibilidade com a API do pymodbus 3.8.6
         result = self._execute_with_retry(
             self.client.read_coils,
@@ -141,7 +246,11 @@ class ModbusClientManager:
             slave=self.unit
         )
         if result:
-            return result.bits[:count]
+            # O pymodbus completa os bits até um múltiplo de 8; a lista da resposta
+            # não é reutilizada, então o excesso é removido sem copiar os bits
+            bits = result.bits
+            del bits[count:]
+            return bits
         return None
     
     def read_discrete_inputs(self, address, count=1):
@@ -155,7 +264,7 @@ class ModbusClientManager:
         Returns:
             list: Lista de estados das entradas (True/False) ou None em caso de falha
         """
-        logger.debug(f"Lendo {count} entrada(s) discreta(s) a partir do endereço {address}")
+        logger.debug("Lendo %d entrada(s) discreta(s) a partir do endereço %d", count, address)
         # Usando kwargs para compatibilidade com a API do pymodbus 3.8.6
         result = self._execute_with_retry(
             self.client.read_discrete_inputs,
@@ -164,21 +273,56 @@ class ModbusClientManager:
             slave=self.unit
         )
         if result:
-            return result.bits[:count]
+            bits = result.bits
+            del bits[count:]
+            return bits
         return None
     
-    def read_holding_registers(self, address, count=1):
+    def read_holding_registers(self, address, count=1, cacheable=False):
         """
         Lê valores de holding registers do dispositivo Modbus.
         
+        Com cacheable=True e cache_ttl positivo, uma leitura da mesma faixa feita
+        há menos de cache_ttl segundos é reaproveitada sem acessar o dispositivo.
+        Deve ser usado apenas para registros que só mudam por escritas deste
+        cliente (ex.: parâmetros de configuração), pois alterações feitas pelo
+        próprio CLP não são percebidas até o cache expirar.
+        
         Args:
             address (int): Endereço inicial dos registros
             count (int): Número de registros a serem lidos
+            cacheable (bool): Permite atender a leitura pelo cache
             
         Returns:
             list: Lista de valores dos registros ou None em caso de falha
         """
-        logger.debug(f"Lendo {count} holding register(s) a partir do endereço {address}")
+        if not (cacheable and self.cache_ttl > 0):
+            return self._read_holding_registers(address, count)
+        
+        # Consulta, leitura e armazenamento sob o mesmo lock: uma escrita concorrente
+        # só invalida o cache antes ou depois, nunca entre a leitura e o armazenamento
+        with self._lock:
+            cached = self._read_cache.get((address, count))
+            if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+                logger.debug("Leitura de %d holding register(s) a partir do endereço %d atendida pelo cache", count, address)
+                return list(cached[1])
+            registers = self._read_holding_registers(address, count)
+            if registers is not None:
+                self._read_cache[(address, count)] = (time.monotonic(), list(registers))
+            return registers
+    
+    def _read_holding_registers(self, address, count):
+        """
+        Lê holding registers diretamente do dispositivo, sem consultar o cache.
+        
+        Args:
+            address (int): Endereço inicial dos registros
+            count (int): Número de registros a serem lidos
+            
+        Returns:
+            list: Lista de valores dos registros ou None em caso de falha
+        """
+        logger.debug("Lendo %d holding register(s) a partir do endereço %d", count, address)
         # Usando kwargs para compatibilidade com a API do pymodbus 3.8.6
         result = self._execute_with_retry(
             self.client.read_holding_registers,
@@ -190,6 +334,26 @@ class ModbusClientManager:
             return result.registers
         return None
     
+    def _invalidate_cache(self, address, count):
+        """
+        Descarta as leituras armazenadas que se sobrepõem a uma faixa escrita.
+        
+        Args:
+            address (int): Endereço inicial da faixa escrita
+            count (int): Número de registros escritos
+        """
+        with self._lock:
+            if not self._read_cache:
+                return
+            end = address + count
+            for key in [key for key in self._read_cache if key[0] < end and address < key[0] + key[1]]:
+                del self._read_cache[key]
+    
+    def clear_cache(self):
+        """Descarta todas as leituras de holding registers armazenadas."""
+        with self._lock:
+            self._read_cache.clear()
+    
     def read_input_registers(self, address, count=1):
         """
         Lê valores de input registers do dispositivo Modbus.
@@ -201,7 +365,7 @@ class ModbusClientManager:
         Returns:
             list: Lista de valores dos registros ou None em caso de falha
         """
-        logger.debug(f"Lendo {count} input register(s) a partir do endereço {address}")
+        logger.debug("Lendo %d input register(s) a partir do endereço %d", count, address)
         # Usando kwargs para compatibilidade com a API do pymodbus 3.8.6
         result = self._execute_with_retry(
             self.client.read_input_registers,
@@ -224,7 +388,7 @@ class ModbusClientManager:
         Returns:
             bool: True se a operação foi bem-sucedida, False caso contrário
         """
-        logger.debug(f"Escrevendo valor {value} no coil de endereço {address}")
+        logger.debug("Escrevendo valor %s no coil de endereço %d", value, address)
         # Usando kwargs para compatibilidade com a API do pymodbus 3.8.6
         result = self._execute_with_retry(
             self.client.write_coil,
@@ -245,20 +409,26 @@ class ModbusClientManager:
         Returns:
             bool: True se a operação foi bem-sucedida, False caso contrário
         """
-        logger.debug(f"Escrevendo valor {value} no registro de endereço {address}")
-        # Usando kwargs para compatibilidade com a API do pymodbus 3.8.6
-        result = self._execute_with_retry(
-            self.client.write_register,
-            address,
-            value,
-            slave=self.unit
-        )
+        logger.debug("Escrevendo valor %s no registro de endereço %d", value, address)
+        with self._lock:
+            # Usando kwargs para compatibilidade com a API do pymodbus 3.8.6
+            result = self._execute_with_retry(
+                self.client.write_register,
+                address,
+                value,
+                slave=self.unit
+            )
+            # Mesmo uma escrita sem resposta pode ter alterado o registro
+            self._invalidate_cache(address, 1)
         return result is not None
     
     def write_registers(self, address, values):
         """
         Escreve valores em múltiplos holding registers do dispositivo Modbus.
         
+        Um único valor é escrito com write_register (FC6), cuja requisição é menor
+        que a de escrita múltipla (FC16) e é tratada mais rapidamente por alguns CLPs.
+        
         Args:
             address (int): Endereço inicial dos registros
             values (list): Lista de valores a serem escritos
@@ -266,12 +436,47 @@ class ModbusClientManager:
         Returns:
             bool: True se a operação foi bem-sucedida, False caso contrário
         """
-        logger.debug(f"Escrevendo {len(values)} valores a partir do endereço {address}")
-        # Usando kwargs para compatibilidade com a API do pymodbus 3.8.6
-        result = self._execute_with_retry(
-            self.client.write_registers,
-            address,
-            values,
-            slave=self.unit
-        )
+        if len(values) == 1:
+            return self.write_register(address, values[0])
+        logger.debug("Escrevendo %d valores a partir do endereço %d", len(values), address)
+        with self._lock:
+            # Usando kwargs para compatibilidade com a API do pymodbus 3.8.6
+            result = self._execute_with_retry(
+                self.client.write_registers,
+                address,
+                values,
+                slave=self.unit
+            )
+            self._invalidate_cache(address, len(values))
         return result is not None
+
+    def update_registers(self, address, updates):
+        """
+        Altera holding registers não contíguos de uma faixa com uma única escrita (FC16).
+
+        A faixa entre address e o maior endereço de updates é lida logo antes da
+        escrita e enviada de volta com os valores de updates sobrepostos; os
+        registros intermediários recebem o valor recém-lido. Leitura e escrita são
+        feitas sem liberar o lock, de modo que nenhuma outra operação desta instância
+        se intercale entre elas. Uma alteração feita pelo próprio CLP entre as duas
+        requisições ainda é sobrescrita, portanto o uso deve se restringir a faixas
+        cujos registros intermediários o CLP não altera. A faixa deve caber em uma
+        leitura e em uma escrita FC16 (até 123 registros).
+
+        Args:
+            address (int): Endereço inicial da faixa
+            updates (dict): Novos valores indexados pelo endereço do registro
+
+        Returns:
+            bool: True se a operação foi bem-sucedida, False caso contrário
+        """
+        count = max(updates) - address + 1
+        with self._lock:
+            values = self.read_holding_registers(address, count)
+            if values is None:
+                logger.error("Falha ao ler a faixa de %d registro(s) a partir do endereço %d antes da escrita", count, address)
+                return False
+            values = list(values)
+            for register_address, value in updates.items():
+                values[register_address - address] = value
+            return self.write_registers(address, values)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Módulo para compartilhamento de gerenciadores de cliente Modbus TCP.
+"""
+
+import atexit
+import logging
+import threading
+from src.communication.modbus_client import ModbusClientManager
+
+logger = logging.getLogger(__name__)
+
+# Gerenciadores compartilhados, indexados por (host, porta)
+_managers = {}
+_managers_lock = threading.Lock()
+
+def get_client_manager(host, port=502, **kwargs):
+    """
+    Obtém o gerenciador de cliente Modbus compartilhado para um servidor.
+    
+    Todas as partes da aplicação que se comunicam com o mesmo (host, porta)
+    recebem a mesma instância de ModbusClientManager e, portanto, a mesma
+    conexão TCP, evitando esgotar o limite de conexões simultâneas do CLP
+    ou de gateways Modbus.
+    
+    Os argumentos de configuração valem apenas para a chamada que cria o
+    gerenciador; nas chamadas seguintes a instância existente é mantida como
+    está, e um aviso é registrado se algum argumento diferir do configurado.
+    
+    Args:
+        host (str): Endereço IP ou hostname do servidor Modbus
+        port (int): Porta TCP do servidor Modbus (padrão: 502)
+        **kwargs: Demais argumentos de ModbusClientManager (timeout, retry_count,
+            retry_delay, unit, retry_cap, retry_jitter, cache_ttl), utilizados
+            apenas na criação do gerenciador
+    
+    Returns:
+        ModbusClientManager: Gerenciador compartilhado para o servidor informado
+    """
+    key = (host, port)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            logger.debug("Criando gerenciador de cliente Modbus para %s:%d", host, port)
+            manager = ModbusClientManager(host, port, **kwargs)
+            _managers[key] = manager
+        else:
+            ignored = {
+                name: value for name, value in kwargs.items()
+                if getattr(manager, name, value) != value
+            }
+            if ignored:
+                logger.warning(
+                    "Gerenciador de %s:%d já existe; argumentos ignorados: %s",
+                    host, port, ", ".join(
+                        "%s=%r (em uso: %r)" % (name, value, getattr(manager, name))
+                        for name, value in ignored.items()
+                    )
+                )
+        return manager
+
+def close_all_client_managers():
+    """
+    Encerra as conexões de todos os gerenciadores compartilhados.
+    
+    Registrada com atexit, para que as conexões sejam fechadas quando o
+    processo terminar.
+    """
+    with _managers_lock:
+        managers = list(_managers.values())
+        _managers.clear()
+    for manager in managers:
+        manager.disconnect()
+
+atexit.register(close_all_client_managers)
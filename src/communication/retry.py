@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Módulo com a política de novas tentativas comum aos clientes Modbus síncrono e assíncrono.
+"""
+
+import random
+from pymodbus.exceptions import ConnectionException
+
+# Falhas da própria conexão, que justificam reconectar e repetir a operação;
+# erros Modbus, como respostas de exceção, não derrubam a conexão persistente
+CONNECTION_ERRORS = (ConnectionException, ConnectionResetError, BrokenPipeError)
+
+def backoff_delay(attempt, retry_delay, retry_cap, retry_jitter=True):
+    """
+    Calcula o atraso antes de uma nova tentativa (backoff exponencial).
+    
+    Args:
+        attempt (int): Número da tentativa que falhou, a partir de 0
+        retry_delay (float): Atraso base entre tentativas em segundos
+        retry_cap (float): Atraso máximo entre tentativas em segundos
+        retry_jitter (bool): Sorteia o atraso entre zero e o valor exponencial
+        
+    Returns:
+        float: Atraso em segundos, limitado a retry_cap
+    """
+    delay = min(retry_cap, retry_delay * (2 ** attempt))
+    if retry_jitter:
+        delay = random.uniform(0, delay)
+    return delay
@@ -5,22 +5,37 @@
 Módulo de configuração para a aplicação de comunicação Modbus.
 """
 
+import os
+from types import MappingProxyType
+
+# Diretório raiz do projeto, resolvido uma única vez na importação
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 # Configurações do cliente Modbus
 MODBUS_HOST = "localhost"    # Endereço IP do servidor Modbus local
 MODBUS_PORT = 5020           # Porta do servidor Modbus local
 MODBUS_TIMEOUT = 3.0          # Timeout em segundos
 MODBUS_RETRY_COUNT = 3        # Número de tentativas de reconexão
 MODBUS_RETRY_DELAY = 1.0      # Delay entre tentativas em segundos
+MODBUS_POOL_SIZE = 4          # Conexões do pool assíncrono (muitos gateways aceitam apenas 2-4)
+SNAPSHOT_TTL = 0.0            # Validade em segundos da leitura completa das tags em read_all_tags (0 desabilita)
+POLL_INTERVAL = 1.0           # Intervalo em segundos da leitura periódica em segundo plano
+REGISTER_CACHE_TTL = 5.0      # Validade em segundos das leituras do cliente para tags com "cacheable": True
 
 # Configurações de logging
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-LOG_FILE = "modbus_app.log"
+LOG_JSON = os.environ.get("LOG_FORMAT_JSON") == "1"  # Registros em JSON compacto no lugar de LOG_FORMAT
+LOG_FILE = os.path.join(PROJECT_ROOT, "modbus_app.log")  # Independe do diretório atual
 LOG_MAX_SIZE = 5 * 1024 * 1024  # 5 MB
 LOG_BACKUP_COUNT = 3
+LOG_BUFFER_SIZE = 64 * 1024   # Buffer de escrita do arquivo de log em bytes
+LOG_FLUSH_INTERVAL = 30.0     # Intervalo em segundos entre gravações do buffer no arquivo
 
 # Mapeamento de registros Modbus baseado no mock server
 # O mock server possui apenas holding registers com 3 variáveis
+# Tags cujos registros só mudam por escritas desta aplicação podem incluir
+# "cacheable": True para reaproveitar leituras por até REGISTER_CACHE_TTL segundos
 REGISTER_MAP = {
     # Holding Registers (hr)
     "ativar": {
@@ -48,3 +63,9 @@ REGISTER_MAP = {
         "register_type": "holding"
     }
 }
+
+# Mapeamento somente leitura: o ModbusDataHandler resolve a configuração das tags
+# uma única vez na criação, portanto alterações em tempo de execução seriam ignoradas
+REGISTER_MAP = MappingProxyType({
+    tag_name: MappingProxyType(tag_config) for tag_name, tag_config in REGISTER_MAP.items()
+})
@@ -9,7 +9,7 @@ Focado na leitura e escrita das tags ativar, entregar, gaveta e posicao_gaveta.
 import logging
 import sys
 import os
-import argparse
+import types
 
 # Adiciona o diretório pai ao path para importar os módulos do projeto
 # Isso é necessário quando executamos o script diretamente
@@ -18,38 +18,336 @@ if __name__ == "__main__":
     if project_root not in sys.path:
         sys.path.insert(0, project_root)
 
-from src.communication import ModbusClientManager
-from src.utils import setup_logging
-from src.application import ModbusDataHandler
-from src.config import MODBUS_HOST, MODBUS_PORT, MODBUS_TIMEOUT, MODBUS_RETRY_COUNT, MODBUS_RETRY_DELAY
+from src.utils import setup_logging, stop_logging
+from src.config import (
+    MODBUS_HOST, MODBUS_PORT, MODBUS_TIMEOUT, MODBUS_RETRY_COUNT, MODBUS_RETRY_DELAY,
+    REGISTER_CACHE_TTL
+)
 
-def main():
-    """Função principal do programa."""
-    # Configurar argumentos da linha de comando
+logger = logging.getLogger(__name__)
+
+# Tags exibidas pela aplicação, na ordem dos registros
+TAG_ORDER = ("ativar", "entregar", "gaveta", "posicao_gaveta")
+
+# Tags booleanas, exibidas no log como "True (1)" / "False (0)"
+BOOL_TAGS = frozenset({"ativar", "entregar"})
+
+# Rótulos usados no log das transições de valor de cada tag
+TAG_LABELS = {
+    "ativar": "Ativar",
+    "entregar": "Entregar",
+    "gaveta": "Gaveta",
+    "posicao_gaveta": "Posicao_Gaveta"
+}
+
+# Textos aceitos como verdadeiro nos argumentos booleanos
+TRUE_STRINGS = frozenset({"true", "t", "1", "yes", "y"})
+
+# Títulos usados na listagem dos valores atuais, calculados uma única vez
+TAG_TITLES = {tag_name: tag_name.capitalize() for tag_name in TAG_ORDER}
+
+def parse_bool(value):
+    """
+    Converte um argumento textual da linha de comando em booleano.
+    
+    Args:
+        value (str): Texto informado pelo usuário (ex.: "true", "1", "yes")
+        
+    Returns:
+        bool: True se o texto representa um valor verdadeiro, False caso contrário
+    """
+    return value.strip().lower() in TRUE_STRINGS
+
+# Argumentos "--new-*" da linha de comando: (tag, atributo em args, conversão do valor)
+NEW_VALUE_ARGS = (
+    ("ativar", "new_ativar", parse_bool),
+    ("entregar", "new_entregar", parse_bool),
+    ("gaveta", "new_gaveta", int),
+    ("posicao_gaveta", "new_posicao_gaveta", int)
+)
+
+def collect_new_values(args):
+    """
+    Extrai dos argumentos da linha de comando os novos valores das tags.
+    
+    Args:
+        args (argparse.Namespace): Argumentos retornados por parse_args()
+        
+    Returns:
+        dict: Novos valores já convertidos, indexados pelo nome da tag
+              (somente as tags informadas na linha de comando)
+    """
+    return {
+        tag_name: convert(getattr(args, attr))
+        for tag_name, attr, convert in NEW_VALUE_ARGS
+        if getattr(args, attr) is not None
+    }
+
+def _needs_old_values(new_values, old_values):
+    """Indica se alguma tag a escrever não possui valor antigo conhecido."""
+    return any(value is not None and tag_name not in old_values for tag_name, value in new_values.items())
+
+def _requested_values(ativar, entregar, gaveta, posicao_gaveta):
+    """Monta o dicionário dos novos valores das tags (None para não alterar)."""
+    return {
+        "ativar": ativar,
+        "entregar": entregar,
+        "gaveta": gaveta,
+        "posicao_gaveta": posicao_gaveta
+    }
+
+def _is_unchanged(new_value, old_value):
+    """Indica se o registro já contém o valor solicitado, dispensando a escrita."""
+    return old_value is not None and old_value == new_value
+
+def _select_changes(new_values, old_values):
+    """
+    Separa as tags cujo valor solicitado difere do valor atual.
+    
+    Args:
+        new_values (dict): Novos valores indexados pelo nome da tag (None para não alterar)
+        old_values (dict): Valores atuais das tags
+        
+    Returns:
+        tuple: (resultados, pendentes, anteriores), onde resultados contém as tags
+            que já possuíam o valor solicitado (registradas como sucesso), pendentes
+            os valores a escrever e anteriores os valores atuais das tags pendentes
+    """
+    results = {}
+    pending = {}
+    previous = {}
+    for tag_name, new_value in new_values.items():
+        if new_value is None:
+            continue
+        
+        old_value = old_values.get(tag_name)
+        if _is_unchanged(new_value, old_value):
+            # O registro já contém o valor solicitado: nenhuma escrita é necessária
+            logger.info("%s: valor %s inalterado, escrita ignorada", TAG_LABELS[tag_name], old_value)
+            results[tag_name] = True
+            continue
+        
+        pending[tag_name] = new_value
+        previous[tag_name] = old_value
+    
+    if not pending:
+        # Todos os valores solicitados já estão nos registros
+        logger.info("Nenhuma alteração a escrever")
+    return results, pending, previous
+
+def _log_write_results(write_results, pending, previous, results):
+    """
+    Registra no log a transição de cada tag escrita e acumula os resultados.
+    
+    Args:
+        write_results (dict): Resultado da escrita de cada tag pendente
+        pending (dict): Valores escritos, indexados pelo nome da tag
+        previous (dict): Valores anteriores das tags escritas
+        results (dict): Dicionário onde os resultados são acumulados
+    """
+    for tag_name, result in write_results.items():
+        results[tag_name] = result
+        if result:
+            # A escrita confirmada pelo dispositivo dispensa uma nova leitura da
+            # tag; o valor registrado é o que foi escrito
+            old_value = previous[tag_name]
+            new_value = pending[tag_name]
+            label = TAG_LABELS[tag_name]
+            if tag_name in BOOL_TAGS:
+                logger.info("%s: %s (%s) -> %s (%d)", label, bool(old_value), old_value, bool(new_value), int(new_value))
+            else:
+                logger.info("%s: %s -> %s", label, old_value, new_value)
+        else:
+            logger.error("Falha ao escrever na tag '%s'", tag_name)
+
+def write_values(handler, ativar=None, entregar=None, gaveta=None, posicao_gaveta=None, old_values=None):
+    """
+    Escreve novos valores nas tags e registra no log a transição de cada uma.
+    
+    Pode ser chamada diretamente por outras interfaces (ex.: uma UI) com um
+    handler já conectado, sem iniciar um novo processo "python src/main.py".
+    
+    Args:
+        handler (ModbusDataHandler): Manipulador de dados já conectado
+        ativar (bool): Novo valor para a tag 'ativar' (None para não alterar)
+        entregar (bool): Novo valor para a tag 'entregar' (None para não alterar)
+        gaveta (int): Novo valor para a tag 'gaveta' (None para não alterar)
+        posicao_gaveta (int): Novo valor para a tag 'posicao_gaveta' (None para não alterar)
+        old_values (dict): Valores já conhecidos das tags; se alguma tag a escrever
+            estiver ausente, todas as tags são lidas antes da escrita
+        
+    Returns:
+        dict: Dicionário com o resultado da escrita de cada tag informada
+              (tags que já possuíam o valor solicitado não são escritas e contam como sucesso)
+    """
+    new_values = _requested_values(ativar, entregar, gaveta, posicao_gaveta)
+    old_values = old_values or {}
+    
+    # Tags sem valor conhecido são lidas todas de uma vez, em vez de uma
+    # requisição por tag
+    if _needs_old_values(new_values, old_values):
+        old_values = {**handler.read_all_tags(), **old_values}
+    
+    results, pending, previous = _select_changes(new_values, old_values)
+    if not pending:
+        return results
+    
+    # Escrever as tags alteradas agrupando registros contíguos em uma única requisição;
+    # as tags não solicitadas nunca são reescritas, pois os valores conhecidos
+    # podem ter sido alterados pelo CLP desde a leitura
+    _log_write_results(handler.write_contiguous_tags(pending), pending, previous, results)
+    return results
+
+async def write_values_async(handler, async_client_manager, ativar=None, entregar=None, gaveta=None,
+                             posicao_gaveta=None, old_values=None):
+    """
+    Versão assíncrona de write_values, para aplicações baseadas em asyncio.
+    
+    A comunicação é feita pelo ModbusAsyncClientManager informado: as faixas
+    de leitura e as sequências de escrita são submetidas concorrentemente,
+    sem bloquear o loop de eventos durante a espera pelo dispositivo.
+    
+    Args:
+        handler (ModbusDataHandler): Manipulador usado no mapeamento e na conversão das tags
+        async_client_manager (ModbusAsyncClientManager): Gerenciador de cliente assíncrono
+        ativar (bool): Novo valor para a tag 'ativar' (None para não alterar)
+        entregar (bool): Novo valor para a tag 'entregar' (None para não alterar)
+        gaveta (int): Novo valor para a tag 'gaveta' (None para não alterar)
+        posicao_gaveta (int): Novo valor para a tag 'posicao_gaveta' (None para não alterar)
+        old_values (dict): Valores já conhecidos das tags; se alguma tag a escrever
+            estiver ausente, todas as tags são lidas antes da escrita
+        
+    Returns:
+        dict: Dicionário com o resultado da escrita de cada tag informada
+    """
+    new_values = _requested_values(ativar, entregar, gaveta, posicao_gaveta)
+    old_values = old_values or {}
+    
+    if _needs_old_values(new_values, old_values):
+        old_values = {**await handler.read_all_tags_async(async_client_manager), **old_values}
+    
+    results, pending, previous = _select_changes(new_values, old_values)
+    if not pending:
+        return results
+    
+    write_results = await handler.write_contiguous_tags_async(async_client_manager, pending)
+    _log_write_results(write_results, pending, previous, results)
+    return results
+
+# Valores padrão dos argumentos da linha de comando
+DEFAULT_ARGS = {
+    "host": MODBUS_HOST,
+    "port": MODBUS_PORT,
+    "timeout": MODBUS_TIMEOUT,
+    "new_ativar": None,
+    "new_entregar": None,
+    "new_gaveta": None,
+    "new_posicao_gaveta": None,
+    "verbose": 0,
+    "quiet": False,
+    "persistent": False,
+    "fast_exit": False
+}
+
+def parse_args(argv=None):
+    """
+    Interpreta os argumentos da linha de comando.
+    
+    Sem argumentos, caso mais comum em execuções repetidas (ex.: pelo cron),
+    os valores padrão são retornados diretamente, sem importar nem montar o
+    argparse, reduzindo o tempo de inicialização.
+    
+    Args:
+        argv (list): Argumentos da linha de comando (None para usar sys.argv)
+        
+    Returns:
+        argparse.Namespace: Argumentos interpretados (types.SimpleNamespace
+            com os valores padrão quando nenhum argumento é informado)
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        return types.SimpleNamespace(**DEFAULT_ARGS)
+    
+    import argparse
     parser = argparse.ArgumentParser(description="Comunicação Modbus para leitura e escrita de tags")
-    parser.add_argument("--host", default=MODBUS_HOST, help="Endereço do servidor Modbus")
-    parser.add_argument("--port", type=int, default=MODBUS_PORT, help="Porta do servidor Modbus")
+    parser.set_defaults(**DEFAULT_ARGS)
+    parser.add_argument("--host", help="Endereço do servidor Modbus")
+    parser.add_argument("--port", type=int, help="Porta do servidor Modbus")
+    parser.add_argument("--timeout", type=float,
+                        help="Tempo limite das operações Modbus em segundos")
     parser.add_argument("--new-ativar", type=str, help="Novo valor para a tag 'ativar' (true/false)")
     parser.add_argument("--new-entregar", type=str, help="Novo valor para a tag 'entregar' (true/false)")
     parser.add_argument("--new-gaveta", type=int, help="Novo valor para a tag 'gaveta'")
     parser.add_argument("--new-posicao-gaveta", type=int, help="Novo valor para a tag 'posicao_gaveta'")
-    args = parser.parse_args()
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-v", "--verbose", action="count",
+                           help="Aumenta o detalhamento do log (-v: INFO, -vv: DEBUG)")
+    verbosity.add_argument("-q", "--quiet", action="store_true",
+                           help="Exibe apenas avisos e erros")
+    parser.add_argument("--persistent", action="store_true",
+                        help="Mantém a conexão aberta ao final, para reutilizá-la em novas "
+                             "execuções de main() no mesmo processo")
+    parser.add_argument("--fast-exit", action="store_true",
+                        help="Encerra o processo sem desconexão ordenada nem finalização do "
+                             "interpretador (apenas para execuções avulsas pela linha de comando; "
+                             "ignorado por chamadas a main())")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """
+    Função principal do programa.
+    
+    Args:
+        argv (list): Argumentos da linha de comando (None para usar sys.argv);
+            permite executar a aplicação várias vezes no mesmo processo
+        
+    Returns:
+        int: Código de saída (0 em caso de sucesso, 1 se a conexão, a leitura
+            ou alguma escrita falhar)
+    """
+    return run(parse_args(argv))
+
+def run(args, exiting=False):
+    """
+    Executa a leitura e a escrita das tags com argumentos já interpretados.
     
-    # Configurar logging
-    setup_logging()
-    logger = logging.getLogger(__name__)
+    Args:
+        args (argparse.Namespace): Argumentos retornados por parse_args()
+        exiting (bool): Indica que o processo será encerrado com os._exit logo em
+            seguida, o que dispensa a desconexão ordenada (usado apenas pelo bloco
+            __main__ com --fast-exit)
+        
+    Returns:
+        int: Código de saída (0 em caso de sucesso, 1 em caso de falha)
+    """
+    # Importados somente após os argumentos, para que "--help" ou um argumento
+    # inválido não paguem a importação do pymodbus
+    from src.communication import get_client_manager
+    from src.application import ModbusDataHandler
+    
+    # Configurar logging; sem -v/--quiet, vale o LOG_LEVEL de config.py
+    if args.quiet:
+        setup_logging(logging.WARNING)
+    elif args.verbose:
+        setup_logging(logging.DEBUG if args.verbose > 1 else logging.INFO)
+    else:
+        setup_logging()
     
     logger.info("Iniciando aplicação de comunicação Modbus")
-    logger.info(f"Conectando ao servidor Modbus em {args.host}:{args.port}")
+    logger.info("Conectando ao servidor Modbus em %s:%d", args.host, args.port)
     
+    client_manager = None
+    exit_code = 1
     try:
-        # Inicializar o cliente Modbus usando valores dos argumentos ou config.py
-        client_manager = ModbusClientManager(
+        # Obter o cliente Modbus compartilhado usando valores dos argumentos ou config.py
+        client_manager = get_client_manager(
             host=args.host,
             port=args.port,
-            timeout=MODBUS_TIMEOUT,
+            timeout=args.timeout,
             retry_count=MODBUS_RETRY_COUNT,
-            retry_delay=MODBUS_RETRY_DELAY
+            retry_delay=MODBUS_RETRY_DELAY,
+            cache_ttl=REGISTER_CACHE_TTL
         )
         
         # Conectar ao servidor Modbus
@@ -58,85 +356,87 @@ def main():
             
             # Criar o handler para manipulação dos dados
             handler = ModbusDataHandler(client_manager)
-
-            logger.info("\nLendo tags de holding registers:")
-            for tag_name in ["ativar", "entregar", "gaveta", "posicao_gaveta"]:
-                value = handler.read_tag(tag_name)
-                logger.info(f"  {tag_name}: {value}")
+            
+            # Valores lidos na inicialização, reutilizados como valores antigos
+            # na escrita para evitar uma nova leitura da mesma tag; a listagem
+            # por tag é detalhe de depuração, pois o resumo final já a inclui
+            logger.debug("\nLendo tags de holding registers:")
+            initial_values = handler.read_all_tags()
+            for tag_name in TAG_ORDER:
+                value = initial_values[tag_name]
+                logger.debug("  %s: %s", tag_name, value)
             
             # Processar novos valores, se fornecidos
-            if any([args.new_ativar is not None, args.new_entregar is not None, 
-                   args.new_gaveta is not None, args.new_posicao_gaveta is not None]):
+            new_values = collect_new_values(args)
+            if new_values:
                 logger.info("=== Escrevendo novos valores ===")
-                
-                # Processar novo valor para 'ativar'
-                if args.new_ativar is not None:
-                    old_ativar = handler.read_tag("ativar")
-                    new_ativar = args.new_ativar.lower() in ["true", "t", "1", "yes", "y"]
-                    result = handler.write_tag("ativar", new_ativar)
-                    if result:
-                        current_value = handler.read_tag("ativar")
-                        logger.info(f"Ativar: {bool(old_ativar)} ({old_ativar}) -> {bool(current_value)} ({current_value})")
-                    else:
-                        logger.error(f"Falha ao escrever na tag 'ativar'")
-                
-                # Processar novo valor para 'entregar'
-                if args.new_entregar is not None:
-                    old_entregar = handler.read_tag("entregar")
-                    new_entregar = args.new_entregar.lower() in ["true", "t", "1", "yes", "y"]
-                    result = handler.write_tag("entregar", new_entregar)
-                    if result:
-                        current_value = handler.read_tag("entregar")
-                        logger.info(f"Entregar: {bool(old_entregar)} ({old_entregar}) -> {bool(current_value)} ({current_value})")
-                    else:
-                        logger.error(f"Falha ao escrever na tag 'entregar'")
-                
-                # Processar novo valor para 'gaveta'
-                if args.new_gaveta is not None:
-                    old_gaveta = handler.read_tag("gaveta")
-                    result = handler.write_tag("gaveta", args.new_gaveta)
-                    if result:
-                        current_value = handler.read_tag("gaveta")
-                        logger.info(f"Gaveta: {old_gaveta} -> {current_value}")
-                    else:
-                        logger.error(f"Falha ao escrever na tag 'gaveta'")
-                
-                # Processar novo valor para 'posicao_gaveta'
-                if args.new_posicao_gaveta is not None:
-                    old_posicao = handler.read_tag("posicao_gaveta")
-                    result = handler.write_tag("posicao_gaveta", args.new_posicao_gaveta)
-                    if result:
-                        current_value = handler.read_tag("posicao_gaveta")
-                        logger.info(f"Posicao_Gaveta: {old_posicao} -> {current_value}")
-                    else:
-                        logger.error(f"Falha ao escrever na tag 'posicao_gaveta'")
+                write_results = write_values(handler, old_values=initial_values, **new_values)
+            else:
+                write_results = {}
             
-            # Ler e exibir valores atuais das tags
-            logger.info("\n=== Valores atuais das tags ===")
-            tags_to_read = ["ativar", "entregar", "gaveta", "posicao_gaveta"]
-            tag_values = {}
+            # Ler e exibir valores atuais das tags; se nenhuma escrita foi enviada
+            # (inclusive quando todos os valores solicitados já estavam nos
+            # registros), os valores lidos na inicialização continuam atuais e
+            # nenhuma nova leitura é feita
+            tags_to_read = TAG_ORDER
+            written = any(
+                not _is_unchanged(value, initial_values.get(tag_name))
+                for tag_name, value in new_values.items()
+            )
+            current_values = handler.read_all_tags() if written else initial_values
+            tag_values = {tag: current_values[tag] for tag in tags_to_read}
             
-            for tag in tags_to_read:
-                value = handler.read_tag(tag)
-                tag_values[tag] = value
+            # As linhas detalhadas só são montadas quando o nível DEBUG está habilitado
+            if logger.isEnabledFor(logging.DEBUG):
+                lines = []
+                for idx, tag in enumerate(tags_to_read):
+                    value = tag_values[tag]
+                    
+                    # Exibir informações detalhadas sobre cada tag
+                    if tag in BOOL_TAGS:
+                        lines.append("    %s (%d): %s (%s)" % (TAG_TITLES[tag], idx, bool(value), value))
+                    else:
+                        lines.append("    %s (%d): %s" % (TAG_TITLES[tag], idx, value))
                 
-                # Exibir informações detalhadas sobre cada tag
-                if tag in ["ativar", "entregar"]:
-                    logger.info(f"{tag.capitalize()} ({list(tags_to_read).index(tag)}): {bool(value)} ({value})")
-                else:
-                    logger.info(f"{tag.capitalize()} ({list(tags_to_read).index(tag)}): {value}")
+                # Logar todas as tags em um único registro, evitando uma passagem
+                # pelos handlers de log para cada linha; no nível INFO basta o resumo
+                logger.debug("\n=== Valores atuais das tags ===\n" + "\n".join(lines))
             
-            logger.info(f"Resumo das tags lidas: {tag_values}")
+            # Resumo no formato "tag=valor", fácil de filtrar com grep; montado
+            # apenas quando o nível INFO está habilitado
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Resumo das tags lidas: %s",
+                    ", ".join(f"{tag}={value}" for tag, value in tag_values.items())
+                )
             
-            # Desconectar
-            client_manager.disconnect()
+            # Sucesso somente se todas as tags foram lidas e todas as escritas confirmadas
+            if all(write_results.values()) and all(value is not None for value in tag_values.values()):
+                exit_code = 0
         else:
             logger.error("Falha ao conectar ao servidor Modbus")
     
     except Exception as e:
-        logger.exception(f"Erro durante a execução: {e}")
+        logger.exception("Erro durante a execução: %s", e)
+    
+    finally:
+        # Desconectar também em caso de erro; no modo persistente a conexão
+        # compartilhada permanece aberta (com keepalive TCP) e é encerrada apenas
+        # ao final do processo. A desconexão só é omitida quando o bloco __main__
+        # encerra o processo em seguida com --fast-exit, liberando o socket pelo sistema
+        if client_manager is not None and not (args.persistent or exiting):
+            client_manager.disconnect()
     
     logger.info("Aplicação encerrada")
+    return exit_code
 
 if __name__ == "__main__":
-    main()
+    cli_args = parse_args()
+    status = run(cli_args, exiting=cli_args.fast_exit)
+    if cli_args.fast_exit:
+        # Gravar os registros pendentes e terminar sem executar a finalização do
+        # interpretador (atexit, coleta de objetos), poupando também o FIN/ACK
+        # do encerramento ordenado da conexão
+        stop_logging()
+        os._exit(status)
+    sys.exit(status)
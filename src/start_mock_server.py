@@ -11,6 +11,7 @@ import logging
 import time
 import threading
 import socket
+import errno
 from pymodbus.server import StartTcpServer
 from pymodbus.datastore import ModbusSequentialDataBlock
 from pymodbus.datastore import ModbusSlaveContext, ModbusServerContext
@@ -32,6 +33,13 @@ logger = logging.getLogger(__name__)
 server_context = None
 slave_context = None
 
+# Últimos valores registrados no log periódico, usados para detectar alterações
+last_logged_values = None
+
+# Atraso antes do primeiro log periódico e intervalo entre os logs, em segundos
+LOG_INITIAL_DELAY = 5.0
+LOG_INTERVAL = 30.0
+
 # Valores iniciais para os registros
 INITIAL_VALUES = {
     0: 0,  # Ativar: False (0)
@@ -40,52 +48,130 @@ INITIAL_VALUES = {
     3: 3   # Posição_Gaveta: 3
 }
 
+# Mapeamento dos endereços dos registros para os nomes das tags
+TAG_NAMES = {
+    0: "Ativar",
+    1: "Entregar",
+    2: "Gaveta",
+    3: "Posição_Gaveta"
+}
+
+# Quantidade de registros ocupados pelas tags, a partir do endereço 0
+TAG_COUNT = len(TAG_NAMES)
+
+# Formato do bloco de log com os valores das tags (ver register_log_args)
+REGISTER_VALUES_FORMAT = (
+    "    Ativar (0): %s (%d)\n"
+    "    Entregar (1): %s (%d)\n"
+    "    Gaveta (2): %d\n"
+    "    Posição_Gaveta (3): %d"
+)
+
+# Endereços das tags booleanas
+BOOL_ADDRESSES = (0, 1)
+
+# Códigos de função que acessam os holding registers
+# (3 = leitura, 6 = escrita simples, 16 = escrita múltipla)
+HOLDING_REGISTER_FCS = (3, 6, 16)
+
 def is_port_in_use(host, port):
     """
     Verifica se uma porta está em uso.
     
+    Tenta associar um socket à porta em vez de conectar-se a ela: a verificação
+    dispensa o handshake TCP e, com SO_REUSEADDR, conexões antigas em TIME_WAIT
+    não são tomadas como um servidor ativo. No Windows, onde SO_REUSEADDR
+    permitiria associar uma porta já em uso, é usado SO_EXCLUSIVEADDRUSE.
+    
     Args:
         host (str): Endereço IP
         port (int): Número da porta
         
     Returns:
-        bool: True se a porta estiver em uso, False caso contrário
+        bool: True se a porta estiver em uso (ou não puder ser associada),
+            False caso contrário
     """
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex((host, port)) == 0
+        if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind((host, port))
+        except OSError as e:
+            if e.errno != errno.EADDRINUSE:
+                # Ex.: EACCES em portas privilegiadas ou EADDRNOTAVAIL para um
+                # endereço inexistente; o servidor também não conseguiria iniciar
+                logger.error("Não foi possível associar %s:%d: %s", host, port, e)
+            return True
+        return False
+
+def register_log_args(values):
+    """
+    Monta os argumentos de REGISTER_VALUES_FORMAT a partir dos valores dos registros.
+    
+    Args:
+        values (list): Valores dos registros 0 a 3
+        
+    Returns:
+        tuple: Argumentos na ordem esperada por REGISTER_VALUES_FORMAT
+    """
+    return (bool(values[0]), values[0], bool(values[1]), values[1], values[2], values[3])
 
 def log_register_values():
     """
     Função para logar periodicamente os valores dos registros.
+    
+    Os valores só são registrados quando diferem dos últimos valores logados,
+    evitando repetir o mesmo bloco a cada ciclo enquanto nada muda.
     """
-    global slave_context
+    global slave_context, last_logged_values
     
     if slave_context is None:
         logger.error("Contexto do slave não disponível para logging")
         return
     
     try:
-        # Ler os valores atuais dos registros diretamente do contexto do slave
-        hr_values = []
-        for i in range(4):  # Lendo os 4 primeiros registros
-            # Usar o método getValues com o tipo de registro correto (3 = Holding Registers)
-            value = slave_context.getValues(3, i, 1)[0]
-            hr_values.append(value)
-        
-        # Logar os valores com informações detalhadas
-        logger.info("=== VALORES ATUAIS DOS REGISTROS ===")
-        logger.info(f"    Ativar (0): {bool(hr_values[0])} ({hr_values[0]})")
-        logger.info(f"    Entregar (1): {bool(hr_values[1])} ({hr_values[1]})")
-        logger.info(f"    Gaveta (2): {hr_values[2]}")
-        logger.info(f"    Posição_Gaveta (3): {hr_values[3]}")
+        # Ler os 4 primeiros registros diretamente do contexto do slave em uma
+        # única chamada (3 = Holding Registers)
+        hr_values = slave_context.getValues(3, 0, TAG_COUNT)
         
-        # Logar o array completo para debug
-        logger.debug(f"Array completo de valores: {hr_values}")
+        if hr_values == last_logged_values:
+            logger.debug("Valores dos registros inalterados desde o último log")
+        else:
+            last_logged_values = hr_values
+            
+            # Logar os valores com informações detalhadas em um único registro,
+            # evitando uma passagem pelos handlers de log para cada linha; os
+            # argumentos só são montados se o nível INFO estiver habilitado
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "=== VALORES ATUAIS DOS REGISTROS ===\n" + REGISTER_VALUES_FORMAT,
+                    *register_log_args(hr_values)
+                )
+            
+            # Logar o array completo para debug
+            logger.debug("Array completo de valores: %s", hr_values)
     except Exception as e:
-        logger.exception(f"Erro ao ler valores dos registros: {e}")
+        logger.exception("Erro ao ler valores dos registros: %s", e)
+
+def periodic_log_loop(stop_event):
+    """
+    Executa log_register_values em intervalos fixos até que stop_event seja sinalizado.
+    
+    Uma única thread é reutilizada durante toda a execução do servidor, em vez
+    de criar um novo Timer a cada ciclo.
     
-    # Agendar a próxima execução em 30 segundos
-    threading.Timer(30.0, log_register_values).start()
+    Args:
+        stop_event (threading.Event): Evento que encerra o loop quando sinalizado
+    """
+    # Aguardar antes do primeiro log para garantir que o servidor esteja pronto
+    if stop_event.wait(LOG_INITIAL_DELAY):
+        return
+    while True:
+        log_register_values()
+        if stop_event.wait(LOG_INTERVAL):
+            return
 
 def update_callback(address, value):
     """
@@ -95,23 +181,16 @@ def update_callback(address, value):
         address (int): Endereço do registro
         value: Novo valor
     """
-    logger.info(f"Registro {address} atualizado para {value}")
+    logger.info("Registro %d atualizado para %s", address, value)
     
     # Mapear o endereço para o nome da tag
-    tag_names = {
-        0: "Ativar",
-        1: "Entregar",
-        2: "Gaveta",
-        3: "Posição_Gaveta"
-    }
-    
-    tag_name = tag_names.get(address, f"Desconhecido({address})")
+    tag_name = TAG_NAMES.get(address, f"Desconhecido({address})")
     
     # Logar informações adicionais para tags booleanas
-    if address in [0, 1]:
-        logger.info(f"Tag {tag_name} atualizada para: {bool(value)} ({value})")
+    if address in BOOL_ADDRESSES:
+        logger.info("Tag %s atualizada para: %s (%s)", tag_name, bool(value), value)
     else:
-        logger.info(f"Tag {tag_name} atualizada para: {value}")
+        logger.info("Tag %s atualizada para: %s", tag_name, value)
     
     return
 
@@ -130,18 +209,26 @@ class CustomModbusSlaveContext(ModbusSlaveContext):
         """
         Sobrescreve o método setValues para adicionar um callback.
         
+        O callback é chamado apenas para os registros cujo valor foi de fato
+        alterado, evitando notificações repetidas quando o mesmo valor é reescrito.
+        
         Args:
             fx_code (int): O código da função Modbus
             address (int): O endereço do registro
             values (list): Os valores a serem definidos
         """
+        notify = self.update_callback is not None and fx_code in HOLDING_REGISTER_FCS
+        if notify:
+            previous_values = self.getValues(fx_code, address, len(values))
+        
         # Chamar o método original
         super().setValues(fx_code, address, values)
         
-        # Chamar o callback, se definido
-        if self.update_callback is not None and fx_code == 3:  # 3 = Holding Registers
+        # Chamar o callback, se definido, somente para os valores alterados
+        if notify:
             for i, value in enumerate(values):
-                self.update_callback(address + i, value)
+                if previous_values[i] != value:
+                    self.update_callback(address + i, value)
 
 def run_mock_server(host="localhost", port=5020):
     """
@@ -155,7 +242,7 @@ def run_mock_server(host="localhost", port=5020):
     
     # Verificar se a porta já está em uso
     if is_port_in_use(host, port):
-        logger.error(f"A porta {port} já está em uso. Não é possível iniciar o servidor.")
+        logger.error("A porta %d já está em uso ou indisponível. Não é possível iniciar o servidor.", port)
         logger.error("Encerre o servidor existente antes de iniciar um novo.")
         sys.exit(1)
     
@@ -169,7 +256,8 @@ def run_mock_server(host="localhost", port=5020):
     for address, value in INITIAL_VALUES.items():
         hr_values[address] = value
     
-    logger.info(f"Array de valores iniciais: {hr_values[:10]}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Array de valores iniciais: %s", hr_values[:10])
     
     # Criar contexto do slave personalizado com callback
     slave_context = CustomModbusSlaveContext(
@@ -177,24 +265,18 @@ def run_mock_server(host="localhost", port=5020):
     )
     
     # Verificar valores iniciais no contexto
-    context_values = []
-    for i in range(4):
-        context_values.append(slave_context.getValues(3, i, 1)[0])
-    logger.info(f"Valores iniciais no contexto: {context_values}")
+    context_values = slave_context.getValues(3, 0, TAG_COUNT)
+    logger.info("Valores iniciais no contexto: %s", context_values)
     
     # Corrigir os valores no contexto se necessário
-    if context_values != [hr_values[0], hr_values[1], hr_values[2], hr_values[3]]:
+    if context_values != hr_values[:TAG_COUNT]:
         logger.warning("Valores no contexto não correspondem aos valores iniciais. Corrigindo...")
-        slave_context.setValues(3, 0, [hr_values[0]])  # Ativar
-        slave_context.setValues(3, 1, [hr_values[1]])  # Entregar
-        slave_context.setValues(3, 2, [hr_values[2]])  # Gaveta
-        slave_context.setValues(3, 3, [hr_values[3]])  # Posição_Gaveta
+        # Ativar, Entregar, Gaveta e Posição_Gaveta escritos em uma única chamada
+        slave_context.setValues(3, 0, hr_values[:TAG_COUNT])
         
         # Verificar novamente
-        context_values = []
-        for i in range(4):
-            context_values.append(slave_context.getValues(3, i, 1)[0])
-        logger.info(f"Valores corrigidos no contexto: {context_values}")
+        context_values = slave_context.getValues(3, 0, TAG_COUNT)
+        logger.info("Valores corrigidos no contexto: %s", context_values)
     
     # Definir o callback para atualizações
     slave_context.update_callback = update_callback
@@ -212,19 +294,24 @@ def run_mock_server(host="localhost", port=5020):
     identity.MajorMinorRevision = '1.0'
     
     # Iniciar o servidor
-    logger.info(f"Iniciando servidor Modbus mock em {host}:{port}")
+    logger.info("Iniciando servidor Modbus mock em %s:%d", host, port)
     logger.info("Modo: Apenas Holding Registers")
-    logger.info("Valores iniciais configurados:")
-    logger.info(f"  Holding Registers:")
-    logger.info(f"    Ativar (0): {bool(context_values[0])} ({context_values[0]})")
-    logger.info(f"    Entregar (1): {bool(context_values[1])} ({context_values[1]})")
-    logger.info(f"    Gaveta (2): {context_values[2]}")
-    logger.info(f"    Posição_Gaveta (3): {context_values[3]}")
+    logger.info(
+        "Valores iniciais configurados:\n"
+        "  Holding Registers:\n" + REGISTER_VALUES_FORMAT,
+        *register_log_args(context_values)
+    )
     logger.info("Pressione Ctrl+C para parar o servidor")
     
-    # Iniciar o timer para logar periodicamente os valores
-    # Aguardar 5 segundos antes do primeiro log para garantir que o servidor esteja pronto
-    threading.Timer(5.0, log_register_values).start()
+    # Iniciar a thread que loga periodicamente os valores; por ser daemon,
+    # ela não impede o encerramento do processo quando o servidor para
+    stop_logging = threading.Event()
+    threading.Thread(
+        target=periodic_log_loop,
+        args=(stop_logging,),
+        name="register-logger",
+        daemon=True
+    ).start()
    
     # Iniciar o servidor
     try:
@@ -236,7 +323,9 @@ def run_mock_server(host="localhost", port=5020):
     except KeyboardInterrupt:
         logger.info("Servidor interrompido pelo usuário")
     except Exception as e:
-        logger.exception(f"Erro ao iniciar o servidor: {e}")
+        logger.exception("Erro ao iniciar o servidor: %s", e)
+    finally:
+        stop_logging.set()
 
 if __name__ == "__main__":
     try:
@@ -249,4 +338,4 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         logger.info("Servidor interrompido pelo usuário")
     except Exception as e:
-        logger.exception(f"Erro ao iniciar o servidor: {e}")
+        logger.exception("Erro ao iniciar o servidor: %s", e)
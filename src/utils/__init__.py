@@ -8,7 +8,8 @@ Este pacote contém funções e classes utilitárias para logging, conversão de
 funcionalidades de suporte.
 """
 
-from src.utils.logger import setup_logging
-from src.utils.data_converter import ModbusDataConverter
+from src.utils.logger import setup_logging, stop_logging
+from src.utils.data_converter import ModbusDataConverter, DECODERS, ENCODERS
+from src.utils.register_planner import plan_reads, MAX_READ_COUNT, MAX_WRITE_COUNT
 
-__all__ = ['setup_logging', 'ModbusDataConverter']
+__all__ = ['setup_logging', 'stop_logging', 'ModbusDataConverter', 'DECODERS', 'ENCODERS', 'plan_reads', 'MAX_READ_COUNT', 'MAX_WRITE_COUNT']
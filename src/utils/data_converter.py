@@ -5,11 +5,24 @@
 Módulo para conversão de dados entre registros Modbus e tipos Python.
 """
 
+import itertools
 import logging
 import struct
 
 logger = logging.getLogger(__name__)
 
+# Bits de cada valor de 8 bits (do menos para o mais significativo), usados para
+# converter um registro em bits com duas consultas em vez de 16 deslocamentos
+_BYTE_BITS = tuple(tuple((value >> i) & 1 == 1 for i in range(8)) for value in range(256))
+
+# Formatos big-endian (padrão Modbus) compilados uma única vez: dois registros
+# de 16 bits e um float de 32 bits
+_TWO_REGISTERS = struct.Struct('>HH')
+_FLOAT32 = struct.Struct('>f')
+
+# Peso de cada posição de bit em um registro de 16 bits
+_BIT_WEIGHTS = tuple(1 << i for i in range(16))
+
 class ModbusDataConverter:
     """
     Classe para conversão de dados entre registros Modbus e tipos Python.
@@ -50,12 +63,8 @@ class ModbusDataConverter:
             logger.error("Registros insuficientes para conversão para int16")
             return None
         
-        value = registers[0] & 0xFFFF
-        # Converter para valor com sinal (complemento de 2)
-        if value & 0x8000:
-            value = value - 0x10000
-        
-        return value
+        # Converter para valor com sinal (complemento de 2) sem desvio condicional
+        return ((registers[0] & 0xFFFF) ^ 0x8000) - 0x8000
     
     @staticmethod
     def registers_to_uint32(registers):
@@ -93,11 +102,8 @@ class ModbusDataConverter:
         # Ordem big-endian (padrão Modbus)
         value = (registers[0] << 16) | registers[1]
         
-        # Converter para valor com sinal (complemento de 2)
-        if value & 0x80000000:
-            value = value - 0x100000000
-        
-        return value
+        # Converter para valor com sinal (complemento de 2) sem desvio condicional
+        return (value ^ 0x80000000) - 0x80000000
     
     @staticmethod
     def registers_to_float32(registers):
@@ -116,9 +122,9 @@ class ModbusDataConverter:
         
         try:
             # Ordem big-endian (padrão Modbus)
-            # Converter para bytes e usar struct.unpack
-            bytes_value = struct.pack('>HH', registers[0], registers[1])
-            return struct.unpack('>f', bytes_value)[0]
+            # Converter para bytes e usar os formatos pré-compilados
+            bytes_value = _TWO_REGISTERS.pack(registers[0], registers[1])
+            return _FLOAT32.unpack(bytes_value)[0]
         except Exception as e:
             logger.exception(f"Erro ao converter registros para float32: {e}")
             return None
@@ -138,7 +144,98 @@ class ModbusDataConverter:
             logger.error("Registro inválido para conversão para bits")
             return None
         
-        return [(register >> i) & 1 == 1 for i in range(16)]
+        return list(_BYTE_BITS[register & 0xFF] + _BYTE_BITS[(register >> 8) & 0xFF])
+    
+    @staticmethod
+    def _unpack_register_pairs(registers, type_code, type_name):
+        """
+        Converte uma lista de pares de registros em valores de 32 bits de uma só vez.
+        
+        Todos os registros são empacotados com uma única chamada a struct.pack e
+        desempacotados com uma única chamada a struct.unpack, em vez de uma
+        conversão por par.
+        
+        Args:
+            registers (list): Lista com um número par de valores de registro
+            type_code (str): Código de formato do struct ("I", "i" ou "f")
+            type_name (str): Nome do tipo, usado nas mensagens de log
+            
+        Returns:
+            list: Lista de valores convertidos ou None em caso de falha
+        """
+        if not registers or len(registers) % 2:
+            logger.error("Número de registros inválido para conversão em lote para %s", type_name)
+            return None
+        
+        try:
+            # Ordem big-endian (padrão Modbus)
+            count = len(registers)
+            bytes_value = struct.pack('>%dH' % count, *registers)
+            return list(struct.unpack('>%d%s' % (count // 2, type_code), bytes_value))
+        except Exception as e:
+            logger.exception("Erro ao converter registros em lote para %s: %s", type_name, e)
+            return None
+    
+    @staticmethod
+    def registers_to_uint32_array(registers):
+        """
+        Converte pares de registros Modbus em inteiros sem sinal de 32 bits.
+        
+        Args:
+            registers (list): Lista com um número par de valores de registro
+            
+        Returns:
+            list: Lista de valores inteiros sem sinal de 32 bits
+        """
+        return ModbusDataConverter._unpack_register_pairs(registers, "I", "uint32")
+    
+    @staticmethod
+    def registers_to_int32_array(registers):
+        """
+        Converte pares de registros Modbus em inteiros com sinal de 32 bits.
+        
+        Args:
+            registers (list): Lista com um número par de valores de registro
+            
+        Returns:
+            list: Lista de valores inteiros com sinal de 32 bits
+        """
+        return ModbusDataConverter._unpack_register_pairs(registers, "i", "int32")
+    
+    @staticmethod
+    def registers_to_float32_array(registers):
+        """
+        Converte pares de registros Modbus em valores de ponto flutuante de 32 bits.
+        
+        Args:
+            registers (list): Lista com um número par de valores de registro
+            
+        Returns:
+            list: Lista de valores de ponto flutuante de 32 bits
+        """
+        return ModbusDataConverter._unpack_register_pairs(registers, "f", "float32")
+    
+    @staticmethod
+    def registers_to_bits_array(registers):
+        """
+        Converte uma lista de registros Modbus em uma lista contínua de bits.
+        
+        Args:
+            registers (list): Lista de valores de registro
+            
+        Returns:
+            list: Lista com 16 valores booleanos por registro, do bit menos
+                significativo do primeiro registro ao mais significativo do último
+        """
+        if registers is None:
+            logger.error("Registros inválidos para conversão para bits")
+            return None
+        
+        bits = []
+        for register in registers:
+            bits += _BYTE_BITS[register & 0xFF]
+            bits += _BYTE_BITS[(register >> 8) & 0xFF]
+        return bits
     
     @staticmethod
     def uint16_to_register(value):
@@ -152,8 +249,8 @@ class ModbusDataConverter:
             int: Valor do registro Modbus
         """
         try:
-            value = int(value) & 0xFFFF
-            return value
+            # Converter para inteiro apenas quando o valor ainda não é um int
+            return (value if type(value) is int else int(value)) & 0xFFFF
         except Exception as e:
             logger.exception(f"Erro ao converter uint16 para registro: {e}")
             return None
@@ -170,11 +267,8 @@ class ModbusDataConverter:
             int: Valor do registro Modbus
         """
         try:
-            # Converter valor com sinal para complemento de 2
-            value = int(value)
-            if value < 0:
-                value = value + 0x10000
-            return value & 0xFFFF
+            # A máscara já produz o complemento de 2 de valores negativos
+            return (value if type(value) is int else int(value)) & 0xFFFF
         except Exception as e:
             logger.exception(f"Erro ao converter int16 para registro: {e}")
             return None
@@ -191,7 +285,7 @@ class ModbusDataConverter:
             list: Lista com dois valores de registro
         """
         try:
-            value = int(value) & 0xFFFFFFFF
+            value = (value if type(value) is int else int(value)) & 0xFFFFFFFF
             # Ordem big-endian (padrão Modbus)
             high = (value >> 16) & 0xFFFF
             low = value & 0xFFFF
@@ -212,10 +306,8 @@ class ModbusDataConverter:
             list: Lista com dois valores de registro
         """
         try:
-            # Converter valor com sinal para complemento de 2
-            value = int(value)
-            if value < 0:
-                value = value + 0x100000000
+            # A máscara já produz o complemento de 2 de valores negativos
+            value = (value if type(value) is int else int(value)) & 0xFFFFFFFF
             # Ordem big-endian (padrão Modbus)
             high = (value >> 16) & 0xFFFF
             low = value & 0xFFFF
@@ -237,9 +329,9 @@ class ModbusDataConverter:
         """
         try:
             # Ordem big-endian (padrão Modbus)
-            # Converter para bytes usando struct.pack
-            bytes_value = struct.pack('>f', float(value))
-            high, low = struct.unpack('>HH', bytes_value)
+            # Converter para bytes usando os formatos pré-compilados
+            bytes_value = _FLOAT32.pack(float(value))
+            high, low = _TWO_REGISTERS.unpack(bytes_value)
             return [high, low]
         except Exception as e:
             logger.exception(f"Erro ao converter float32 para registros: {e}")
@@ -261,11 +353,29 @@ class ModbusDataConverter:
                 logger.error("Número de bits excede o limite de 16")
                 return None
             
-            register = 0
-            for i, bit in enumerate(bits):
-                if bit:
-                    register |= (1 << i)
-            return register
+            # Somar os pesos dos bits verdadeiros sem um desvio por bit no Python
+            return sum(itertools.compress(_BIT_WEIGHTS, bits))
         except Exception as e:
             logger.exception(f"Erro ao converter bits para registro: {e}")
             return None
+
+# Conversores indexados pelo "type" do REGISTER_MAP, para que a escolha da
+# conversão seja uma única consulta ao dicionário em vez de uma cadeia de if/elif
+DECODERS = {
+    # Booleanos como 0/1, como o ModbusDataHandler os retorna
+    'bool': lambda registers: 1 if registers[0] else 0,
+    'uint16': ModbusDataConverter.registers_to_uint16,
+    'int16': ModbusDataConverter.registers_to_int16,
+    'uint32': ModbusDataConverter.registers_to_uint32,
+    'int32': ModbusDataConverter.registers_to_int32,
+    'float32': ModbusDataConverter.registers_to_float32
+}
+
+ENCODERS = {
+    'bool': lambda value: 1 if value else 0,
+    'uint16': ModbusDataConverter.uint16_to_register,
+    'int16': ModbusDataConverter.int16_to_register,
+    'uint32': ModbusDataConverter.uint32_to_registers,
+    'int32': ModbusDataConverter.int32_to_registers,
+    'float32': ModbusDataConverter.float32_to_registers
+}
@@ -5,48 +5,237 @@
 Módulo para configuração de logging da aplicação.
 """
 
+import atexit
+import io
+import json
 import logging
 import logging.handlers
 import os
+import queue
+import stat
 import sys
+import threading
+import time
 
 # Importação relativa para evitar problemas de importação circular
-from src.config import LOG_LEVEL, LOG_FORMAT, LOG_FILE, LOG_MAX_SIZE, LOG_BACKUP_COUNT
+from src.config import (
+    LOG_LEVEL, LOG_FORMAT, LOG_FILE, LOG_MAX_SIZE, LOG_BACKUP_COUNT,
+    LOG_BUFFER_SIZE, LOG_FLUSH_INTERVAL, LOG_JSON
+)
 
-def setup_logging():
+# Thread que grava os registros enfileirados nos handlers de console e arquivo
+_queue_listener = None
+
+class CachedTimeFormatter(logging.Formatter):
+    """
+    Formatter que reaproveita o horário já formatado para registros do mesmo segundo.
+    
+    O logging.Formatter padrão chama time.strftime para cada registro; como as
+    mensagens de uma operação costumam ocorrer no mesmo segundo, a parte do
+    horário até os segundos é formatada uma única vez e apenas os milissegundos
+    são acrescentados a cada registro.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ((segundo, formato), horário formatado), atualizados juntos em uma única atribuição
+        self._cached_time = (None, None)
+    
+    def formatTime(self, record, datefmt=None):
+        key = (int(record.created), datefmt)
+        cached_key, formatted = self._cached_time
+        if key != cached_key:
+            formatted = time.strftime(datefmt or self.default_time_format, self.converter(key[0]))
+            self._cached_time = (key, formatted)
+        if datefmt is None and self.default_msec_format:
+            return self.default_msec_format % (formatted, record.msecs)
+        return formatted
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatter compacto que gera um objeto JSON por registro.
+    
+    O horário é gravado em milissegundos desde a época, sem conversão de
+    calendário, e o nível é reduzido à inicial, resultando em registros
+    menores e mais baratos de formatar e gravar; adequado quando o log é
+    processado por ferramentas em vez de lido diretamente. Exemplo:
+    {"t":1700000000000,"l":"I","n":"__main__","m":"Aplicação encerrada"}
+    """
+    
+    def format(self, record):
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message = message + "\n" + record.exc_text
+        return '{"t":%d,"l":"%s","n":%s,"m":%s}' % (
+            int(record.created * 1000),
+            record.levelname[0],
+            json.dumps(record.name),
+            json.dumps(message, ensure_ascii=False)
+        )
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler que acumula os registros em um buffer antes de gravá-los.
+    
+    O RotatingFileHandler padrão descarrega o arquivo a cada registro, o que
+    custa uma chamada de sistema por mensagem. Aqui o arquivo é aberto em modo
+    binário com um io.BufferedWriter, e o buffer é gravado apenas quando fica
+    cheio, a cada flush_interval segundos, em registros de nível flush_level ou
+    superior e no encerramento do logging (logging.shutdown).
+    
+    O tamanho do arquivo é mantido em memória e atualizado a cada registro,
+    de modo que a verificação de rotação não consulta o sistema de arquivos.
+    """
+    
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding=None,
+                 buffer_size=LOG_BUFFER_SIZE, flush_interval=LOG_FLUSH_INTERVAL,
+                 flush_level=logging.ERROR):
+        """
+        Inicializa o handler.
+        
+        Args:
+            filename (str): Caminho do arquivo de log
+            maxBytes (int): Tamanho máximo do arquivo antes da rotação (0 desabilita)
+            backupCount (int): Número de arquivos de backup mantidos
+            encoding (str): Codificação do texto gravado (padrão: utf-8)
+            buffer_size (int): Tamanho do buffer de escrita em bytes
+            flush_interval (float): Intervalo em segundos entre gravações
+                periódicas do buffer (0 desabilita)
+            flush_level (int): Nível a partir do qual cada registro é gravado imediatamente
+        """
+        self.buffer_size = buffer_size
+        self.flush_level = flush_level
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding)
+        self._byte_encoding = self.encoding or "utf-8"
+        self._stop_flushing = threading.Event()
+        if flush_interval > 0:
+            threading.Thread(
+                target=self._flush_loop,
+                args=(flush_interval,),
+                name="log-flusher",
+                daemon=True
+            ).start()
+    
+    def _open(self):
+        """Abre o arquivo em modo binário com o buffer de escrita configurado."""
+        raw = open(self.baseFilename, self.mode + "b", buffering=0)
+        # Um único fstat na abertura fornece o tamanho inicial do arquivo e
+        # indica se ele pode ser rotacionado: arquivos especiais (ex.: /dev/null)
+        # nunca são rotacionados (bpo-45401)
+        file_stat = os.fstat(raw.fileno())
+        self._size = file_stat.st_size
+        self._rotatable = stat.S_ISREG(file_stat.st_mode)
+        return io.BufferedWriter(raw, buffer_size=self.buffer_size)
+    
+    def _encode(self, record):
+        """Formata o registro e o converte nos bytes gravados no arquivo."""
+        return (self.format(record) + self.terminator).encode(self._byte_encoding, self.errors or "strict")
+    
+    def _needs_rollover(self, size):
+        """Indica se gravar size bytes faria o arquivo atingir maxBytes."""
+        return self.maxBytes > 0 and self._rotatable and self._size + size >= self.maxBytes
+    
+    def shouldRollover(self, record):
+        """
+        Verifica se o registro faria o arquivo ultrapassar maxBytes.
+        
+        Utiliza o tamanho mantido em memória, sem consultar o sistema de arquivos.
+        """
+        if self.stream is None:
+            self.stream = self._open()
+        return self._needs_rollover(len(self._encode(record)))
+    
+    def emit(self, record):
+        """Grava o registro no buffer, descarregando-o apenas para níveis graves."""
+        try:
+            # O registro é formatado uma única vez, tanto para a verificação
+            # de rotação quanto para a escrita
+            data = self._encode(record)
+            if self.stream is None:
+                self.stream = self._open()
+            if self._needs_rollover(len(data)):
+                # A reabertura em _open reinicia o tamanho do arquivo
+                self.doRollover()
+            self.stream.write(data)
+            self._size += len(data)
+            if record.levelno >= self.flush_level:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def _flush_loop(self, interval):
+        """Grava o buffer em intervalos fixos até que o handler seja fechado."""
+        while not self._stop_flushing.wait(interval):
+            self.flush()
+    
+    def close(self):
+        """Encerra a gravação periódica e fecha o arquivo, gravando o buffer pendente."""
+        self._stop_flushing.set()
+        super().close()
+
+def setup_logging(level_override=None):
     """
     Configura o sistema de logging da aplicação.
     
     Configura handlers para console e arquivo, com rotação de arquivos
     quando o tamanho máximo é atingido.
+    
+    O logger raiz recebe apenas um QueueHandler, que enfileira os registros;
+    a formatação e a escrita no console e no arquivo são feitas por um
+    QueueListener em uma thread própria, de modo que quem registra uma mensagem
+    (ex.: durante a comunicação Modbus) não espera pelo disco.
+    
+    Chamadas seguintes (ex.: main() executada várias vezes no mesmo processo)
+    apenas ajustam o nível de log, mantendo os handlers e o arquivo abertos;
+    para reconfigurar por completo, chame stop_logging() antes.
+    
+    Args:
+        level_override (int): Nível de log a utilizar no lugar de LOG_LEVEL
+            (ex.: logging.DEBUG); None mantém o nível da configuração
     """
-    # Criar o diretório de logs se não existir
-    log_dir = os.path.dirname(LOG_FILE)
-    if log_dir and not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    global _queue_listener
     
-    # Obter o nível de log a partir da configuração
-    log_level = getattr(logging, LOG_LEVEL.upper(), logging.INFO)
+    # Obter o nível de log a partir do argumento ou da configuração
+    if level_override is not None:
+        log_level = level_override
+    else:
+        log_level = getattr(logging, LOG_LEVEL.upper(), logging.INFO)
     
-    # Configurar o logger raiz
     root_logger = logging.getLogger()
+    
+    # Logging já configurado: somente o nível pode mudar entre as chamadas
+    if _queue_listener is not None:
+        root_logger.setLevel(log_level)
+        for handler in _queue_listener.handlers:
+            handler.setLevel(log_level)
+        return root_logger
+    
+    # Criar o diretório de logs se não existir; exist_ok evita a verificação
+    # prévia e a disputa entre duas configurações simultâneas
+    log_dir = os.path.dirname(LOG_FILE)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    
+    # Configurar o logger raiz
     root_logger.setLevel(log_level)
     
     # Remover handlers existentes para evitar duplicação
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
+    root_logger.handlers.clear()
     
-    # Criar formatador
-    formatter = logging.Formatter(LOG_FORMAT)
+    # Criar formatador (JSON compacto com LOG_FORMAT_JSON=1 no ambiente)
+    formatter = JsonFormatter() if LOG_JSON else CachedTimeFormatter(LOG_FORMAT)
     
     # Configurar handler para console
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
     
     # Configurar handler para arquivo com rotação
-    file_handler = logging.handlers.RotatingFileHandler(
+    file_handler = BufferedRotatingFileHandler(
         LOG_FILE,
         maxBytes=LOG_MAX_SIZE,
         backupCount=LOG_BACKUP_COUNT,
@@ -54,10 +243,38 @@ def setup_logging():
     )
     file_handler.setLevel(log_level)
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
+    
+    # Enfileirar os registros e gravá-los em segundo plano; SimpleQueue evita
+    # o custo de sincronização de queue.Queue para quem registra as mensagens
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue,
+        console_handler,
+        file_handler,
+        respect_handler_level=True
+    )
+    _queue_listener.start()
     
     # Configurar logging para bibliotecas externas
     logging.getLogger('pymodbus').setLevel(logging.WARNING)
     
     logging.info("Sistema de logging configurado")
     return root_logger
+
+def stop_logging():
+    """
+    Encerra a gravação em segundo plano, aguardando os registros pendentes e
+    fechando os handlers de console e arquivo.
+    
+    Registrada com atexit para que nenhuma mensagem enfileirada se perca quando
+    o processo terminar; pode ser chamada mais de uma vez.
+    """
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener = None
+
+atexit.register(stop_logging)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Módulo para planejamento de leituras Modbus agrupadas.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Quantidade máxima de itens por requisição de leitura definida pelo protocolo Modbus
+MAX_READ_COUNT = {
+    "holding": 125,
+    "input": 125,
+    "coil": 2000,
+    "discrete_input": 2000
+}
+
+# Quantidade máxima de holding registers por requisição de escrita múltipla (FC16)
+MAX_WRITE_COUNT = 123
+
+def plan_reads(register_map, positions=None, max_gap=0, max_run=None):
+    """
+    Agrupa as tags de um mapeamento de registros em leituras de faixas contíguas.
+    
+    As tags são agrupadas por tipo de registro e ordenadas pelo endereço; tags
+    adjacentes (ou separadas por até max_gap registros não utilizados) são
+    fundidas em uma única leitura, respeitando o limite de itens por requisição.
+    
+    Args:
+        register_map (dict): Mapeamento de tags no formato do REGISTER_MAP
+        positions (dict): Endereço efetivo de cada tag, quando diferente do
+            "address" do mapeamento (None para usar sempre o "address")
+        max_gap (int): Número máximo de registros não utilizados lidos entre duas tags
+        max_run (int): Número máximo de registros por leitura (None para usar o
+            limite do protocolo para cada tipo de registro)
+    
+    Returns:
+        list: Lista de tuplas (register_type, start, count, tags), onde tags é uma
+            lista de tuplas (nome da tag, deslocamento na faixa, quantidade)
+    """
+    positions = positions or {}
+    
+    # Agrupar as tags por tipo de registro
+    groups = {}
+    for tag_name, tag_config in register_map.items():
+        register_type = tag_config.get("register_type", "holding")
+        address = positions.get(tag_name, tag_config["address"])
+        groups.setdefault(register_type, []).append((address, tag_config["count"], tag_name))
+    
+    plans = []
+    for register_type, tags in groups.items():
+        limit = max_run or MAX_READ_COUNT.get(register_type, MAX_READ_COUNT["holding"])
+        tags.sort()
+        start = end = None
+        members = []
+        for address, count, tag_name in tags:
+            # Fechar a faixa atual se a próxima tag não couber nela
+            if members and (address - end > max_gap or address + count - start > limit):
+                plans.append((register_type, start, end - start, members))
+                members = []
+            if not members:
+                start = end = address
+            members.append((tag_name, address - start, count))
+            end = max(end, address + count)
+        if members:
+            plans.append((register_type, start, end - start, members))
+    
+    logger.debug("%d tag(s) agrupada(s) em %d leitura(s)", len(register_map), len(plans))
+    return plans